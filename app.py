@@ -3,260 +3,487 @@ LTI 1.1 Test Platform
 A local development tool for testing LTI 1.1 tool integrations.
 """
 
+import asyncio
+import os
+import queue
 import sqlite3
+import threading
 import hashlib
 import hmac
 import base64
-import urllib.parse
+import binascii
+import io
+import secrets
 import uuid
 import time
 import json
+import logging
+import xml.dom.minidom
+import xml.etree.ElementTree as ET
 from datetime import datetime
+from functools import lru_cache
+from html import escape
 from typing import Optional
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 
-from fastapi import FastAPI, Request, Form, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import BackgroundTasks, FastAPI, Request, Form, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel
 import uvicorn
 
-app = FastAPI(title="LTI 1.1 Test Platform")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open every pooled connection up front so no request pays for it
+    _fill_pools()
+    prepare_database()
+    start_grade_writer()
+    yield
+    await stop_grade_writer()
+    close_pools()
+
+
+app = FastAPI(title="LTI 1.1 Test Platform", lifespan=lifespan)
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=6)
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers keep versioned assets (?v=...) for a year."""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if scope.get("query_string"):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+# Only the static/ directory next to this file is served, wherever the
+# server is started from; the code and the database stay private
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+
+def _asset_version(*names: str) -> str:
+    """Short content hash used to bust the browser cache when an asset changes."""
+    digest = hashlib.sha1()
+    for name in names:
+        with open(os.path.join(STATIC_DIR, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
 
 # Mount static files directory
-app.mount("/static", StaticFiles(directory="."), name="static")
+app.mount("/static", CachedStaticFiles(directory=STATIC_DIR), name="static")
+ASSET_VERSION = _asset_version("app.css", "app.js", "launch.css")
 
 # Database setup
 DB_PATH = "lti_platform.db"
+READ_POOL_SIZE = os.cpu_count() or 4
+
+# Connections are opened once and reused across requests: one writer (SQLite
+# serializes writes anyway) and a handful of readers.
+_read_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=READ_POOL_SIZE)
+_write_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=1)
+_pool_lock = threading.Lock()
+_pool_ready = False
+
+# The writer refreshes planner statistics with PRAGMA optimize every this many
+# borrows (and once more at shutdown).
+OPTIMIZE_EVERY = 1000
+_write_borrows = 0
+
+# Aggregates only keep an ORDER BY of their own from SQLite 3.44; older
+# versions fetch list pages as plain rows
+JSON_ORDERED_PAGES = sqlite3.sqlite_version_info >= (3, 44, 0)
+
+
+# Applied once per pooled connection: WAL lets readers proceed while the
+# writer commits, NORMAL sync is safe under WAL, and mmap lets reads come
+# straight from the OS page cache.
+_CONNECTION_PRAGMAS = """
+    PRAGMA journal_mode = WAL;
+    PRAGMA synchronous = NORMAL;
+    PRAGMA busy_timeout = 5000;
+    PRAGMA cache_size = -20000;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA mmap_size = 268435456;
+    PRAGMA foreign_keys = ON;
+"""
 
 
-def get_db():
-    conn = sqlite3.connect(DB_PATH)
+def _connect(write: bool = False) -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
     conn.row_factory = sqlite3.Row
+    conn.executescript(_CONNECTION_PRAGMAS)
+    if write:
+        conn.execute("PRAGMA journal_size_limit = 67108864")
     return conn
 
 
+def _fill_pools():
+    global _pool_ready
+    with _pool_lock:
+        if _pool_ready:
+            return
+        _write_pool.put(_connect(write=True))
+        for _ in range(READ_POOL_SIZE):
+            _read_pool.put(_connect())
+        _pool_ready = True
+
+
+@contextmanager
+def get_db(write: bool = False):
+    """Borrow a pooled connection; pass write=True for statements that modify data."""
+    global _write_borrows
+    if not _pool_ready:
+        _fill_pools()
+    pool = _write_pool if write else _read_pool
+    conn = pool.get()
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        if write:
+            _write_borrows += 1
+            if _write_borrows % OPTIMIZE_EVERY == 0:
+                conn.execute("PRAGMA optimize")
+        pool.put(conn)
+
+
+def close_pools():
+    """Run a final PRAGMA optimize and close every pooled connection."""
+    global _pool_ready
+    with _pool_lock:
+        if not _pool_ready:
+            return
+        writer = _write_pool.get()
+        writer.execute("PRAGMA optimize")
+        writer.close()
+        while not _read_pool.empty():
+            _read_pool.get_nowait().close()
+        _pool_ready = False
+
+
+# Bump whenever _SCHEMA_SQL changes so existing databases pick up the change.
+SCHEMA_VERSION = 5
+
+_SCHEMA_SQL = """
+-- Tool Servers table
+CREATE TABLE IF NOT EXISTS tool_servers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Tools table (one tool per server, but with its own config)
+CREATE TABLE IF NOT EXISTS tools (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tool_server_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    launch_path TEXT NOT NULL DEFAULT '/lti/launch',
+    consumer_key TEXT NOT NULL,
+    consumer_secret TEXT NOT NULL,
+    custom_params TEXT,
+    description TEXT,
+    launch_url_override TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (tool_server_id) REFERENCES tool_servers(id) ON DELETE CASCADE
+);
+
+-- Courses table
+CREATE TABLE IF NOT EXISTS courses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    code TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Users table (students and teachers)
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    role TEXT NOT NULL CHECK(role IN ('student', 'teacher')),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Course enrollments
+CREATE TABLE IF NOT EXISTS enrollments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    course_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    UNIQUE(course_id, user_id)
+);
+
+-- Course-Tool associations
+CREATE TABLE IF NOT EXISTS course_tools (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    course_id INTEGER NOT NULL,
+    tool_id INTEGER NOT NULL,
+    resource_link_id TEXT NOT NULL,
+    resource_link_title TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE,
+    FOREIGN KEY (tool_id) REFERENCES tools(id) ON DELETE CASCADE,
+    UNIQUE(course_id, tool_id)
+);
+
+-- Launch logs
+CREATE TABLE IF NOT EXISTS launch_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    course_tool_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    launch_params TEXT NOT NULL,
+    signed_params TEXT NOT NULL,
+    oauth_signature TEXT NOT NULL,
+    launched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (course_tool_id) REFERENCES course_tools(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Grade results (outcomes)
+CREATE TABLE IF NOT EXISTS grade_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    course_tool_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    sourced_id TEXT NOT NULL,
+    score REAL,
+    raw_xml TEXT,
+    pretty_xml TEXT,
+    received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (course_tool_id) REFERENCES course_tools(id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+-- Catalog version: bumped by the triggers below whenever a tool server, tool or
+-- course tool changes, so list pages showing tool names get a new ETag in
+-- every worker and across restarts. It starts from a random value so a
+-- recreated database doesn't repeat an old ETag.
+CREATE TABLE IF NOT EXISTS catalog_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    generation INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO catalog_version (id, generation) VALUES (1, abs(random() % 1000000000));
+
+CREATE TRIGGER IF NOT EXISTS tool_servers_insert_catalog AFTER INSERT ON tool_servers
+BEGIN UPDATE catalog_version SET generation = generation + 1; END;
+CREATE TRIGGER IF NOT EXISTS tool_servers_update_catalog AFTER UPDATE ON tool_servers
+BEGIN UPDATE catalog_version SET generation = generation + 1; END;
+CREATE TRIGGER IF NOT EXISTS tool_servers_delete_catalog AFTER DELETE ON tool_servers
+BEGIN UPDATE catalog_version SET generation = generation + 1; END;
+CREATE TRIGGER IF NOT EXISTS tools_insert_catalog AFTER INSERT ON tools
+BEGIN UPDATE catalog_version SET generation = generation + 1; END;
+CREATE TRIGGER IF NOT EXISTS tools_update_catalog AFTER UPDATE ON tools
+BEGIN UPDATE catalog_version SET generation = generation + 1; END;
+CREATE TRIGGER IF NOT EXISTS tools_delete_catalog AFTER DELETE ON tools
+BEGIN UPDATE catalog_version SET generation = generation + 1; END;
+CREATE TRIGGER IF NOT EXISTS course_tools_insert_catalog AFTER INSERT ON course_tools
+BEGIN UPDATE catalog_version SET generation = generation + 1; END;
+CREATE TRIGGER IF NOT EXISTS course_tools_update_catalog AFTER UPDATE ON course_tools
+BEGIN UPDATE catalog_version SET generation = generation + 1; END;
+CREATE TRIGGER IF NOT EXISTS course_tools_delete_catalog AFTER DELETE ON course_tools
+BEGIN UPDATE catalog_version SET generation = generation + 1; END;
+
+-- Indexes for the foreign keys and ordering used by the launch/grade joins;
+-- the (time, id) ones serve the newest-first keyset pagination
+DROP INDEX IF EXISTS idx_launch_logs_launched;
+CREATE INDEX IF NOT EXISTS idx_launch_logs_page ON launch_logs(launched_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_grade_results_page ON grade_results(received_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_launch_logs_user ON launch_logs(user_id);
+CREATE INDEX IF NOT EXISTS idx_launch_logs_ct ON launch_logs(course_tool_id);
+CREATE INDEX IF NOT EXISTS idx_course_tools_tool ON course_tools(tool_id);
+-- (course_id, resource_link_id) is how outcome sourcedIds find their course
+-- tool, and it also serves the plain course_id lookups
+DROP INDEX IF EXISTS idx_course_tools_course;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_course_tools_course_link ON course_tools(course_id, resource_link_id);
+CREATE INDEX IF NOT EXISTS idx_tools_server ON tools(tool_server_id);
+CREATE INDEX IF NOT EXISTS idx_grade_results_ct_user ON grade_results(course_tool_id, user_id);
+CREATE INDEX IF NOT EXISTS idx_grade_results_user ON grade_results(user_id);
+"""
+
+
 def init_db():
     """Initialize the database with all required tables."""
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    # Tool Servers table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS tool_servers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            domain TEXT NOT NULL,
-            port INTEGER NOT NULL,
-            description TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Tools table (one tool per server, but with its own config)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS tools (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tool_server_id INTEGER NOT NULL,
-            name TEXT NOT NULL,
-            launch_path TEXT NOT NULL DEFAULT '/lti/launch',
-            consumer_key TEXT NOT NULL,
-            consumer_secret TEXT NOT NULL,
-            custom_params TEXT,
-            description TEXT,
-            launch_url_override TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (tool_server_id) REFERENCES tool_servers(id) ON DELETE CASCADE
-        )
-    """)
-    
-    # Courses table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS courses (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            code TEXT NOT NULL UNIQUE,
-            description TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Users table (students and teachers)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT NOT NULL UNIQUE,
-            role TEXT NOT NULL CHECK(role IN ('student', 'teacher')),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Course enrollments
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS enrollments (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            course_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-            UNIQUE(course_id, user_id)
-        )
-    """)
-    
-    # Course-Tool associations
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS course_tools (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            course_id INTEGER NOT NULL,
-            tool_id INTEGER NOT NULL,
-            resource_link_id TEXT NOT NULL,
-            resource_link_title TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (course_id) REFERENCES courses(id) ON DELETE CASCADE,
-            FOREIGN KEY (tool_id) REFERENCES tools(id) ON DELETE CASCADE,
-            UNIQUE(course_id, tool_id)
-        )
-    """)
-    
-    # Launch logs
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS launch_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            course_tool_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            launch_params TEXT NOT NULL,
-            signed_params TEXT NOT NULL,
-            oauth_signature TEXT NOT NULL,
-            launched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (course_tool_id) REFERENCES course_tools(id) ON DELETE CASCADE,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
-    """)
-    
-    # Grade results (outcomes)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS grade_results (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            course_tool_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            sourced_id TEXT NOT NULL,
-            score REAL,
-            raw_xml TEXT,
-            received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (course_tool_id) REFERENCES course_tools(id) ON DELETE CASCADE,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
-    """)
-    
-    conn.commit()
-    conn.close()
+    with get_db(write=True) as conn:
+        # One transaction for the whole schema instead of one per statement;
+        # IMMEDIATE so workers starting together take turns
+        conn.executescript(f"BEGIN IMMEDIATE;\n{_SCHEMA_SQL}\nCOMMIT;")
+        
+        # Columns added since the table was first created; CREATE TABLE IF NOT
+        # EXISTS leaves an older table as it was
+        conn.execute("BEGIN IMMEDIATE")
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(grade_results)")}
+        if "pretty_xml" not in columns:
+            conn.execute("ALTER TABLE grade_results ADD COLUMN pretty_xml TEXT")
+        conn.commit()
 
 
 def seed_demo_data():
     """Create demo courses with students and teachers if none exist."""
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    # Check if we already have data
-    cursor.execute("SELECT COUNT(*) FROM courses")
-    if cursor.fetchone()[0] > 0:
-        conn.close()
-        return
-    
-    # Create demo users - 2 teachers
-    teachers = [
-        ("Dr. Alice Smith", "alice.smith@example.edu", "teacher"),
-        ("Prof. Bob Johnson", "bob.johnson@example.edu", "teacher"),
-    ]
-    
-    # 4 students
-    students = [
-        ("Charlie Brown", "charlie.brown@example.edu", "student"),
-        ("Diana Prince", "diana.prince@example.edu", "student"),
-        ("Edward Norton", "edward.norton@example.edu", "student"),
-        ("Fiona Green", "fiona.green@example.edu", "student"),
-    ]
-    
-    for name, email, role in teachers + students:
-        cursor.execute(
+    with get_db(write=True) as conn:
+        cursor = conn.cursor()
+        # Only the course count is read back, so skip building Row objects
+        cursor.row_factory = None
+        # Take the write lock before checking so concurrent workers can't both seed
+        cursor.execute("BEGIN IMMEDIATE")
+        
+        # Check if we already have data
+        cursor.execute("SELECT COUNT(*) FROM courses")
+        if cursor.fetchone()[0] > 0:
+            return
+        
+        # Create demo users - 2 teachers
+        teachers = [
+            ("Dr. Alice Smith", "alice.smith@example.edu", "teacher"),
+            ("Prof. Bob Johnson", "bob.johnson@example.edu", "teacher"),
+        ]
+        
+        # 4 students
+        students = [
+            ("Charlie Brown", "charlie.brown@example.edu", "student"),
+            ("Diana Prince", "diana.prince@example.edu", "student"),
+            ("Edward Norton", "edward.norton@example.edu", "student"),
+            ("Fiona Green", "fiona.green@example.edu", "student"),
+        ]
+        
+        cursor.executemany(
             "INSERT INTO users (name, email, role) VALUES (?, ?, ?)",
-            (name, email, role)
+            teachers + students
         )
-    
-    # Create demo courses
-    courses = [
-        ("Introduction to Python", "CS101", "Learn the basics of Python programming"),
-        ("Web Development", "WEB201", "Build modern web applications"),
-        ("Data Science Fundamentals", "DS301", "Introduction to data analysis and machine learning"),
-    ]
-    
-    for name, code, description in courses:
-        cursor.execute(
+        
+        # Create demo courses
+        courses = [
+            ("Introduction to Python", "CS101", "Learn the basics of Python programming"),
+            ("Web Development", "WEB201", "Build modern web applications"),
+            ("Data Science Fundamentals", "DS301", "Introduction to data analysis and machine learning"),
+        ]
+        
+        cursor.executemany(
             "INSERT INTO courses (name, code, description) VALUES (?, ?, ?)",
-            (name, code, description)
+            courses
         )
-    
-    # Enroll all users in all courses
-    cursor.execute("SELECT id FROM users")
-    user_ids = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute("SELECT id FROM courses")
-    course_ids = [row[0] for row in cursor.fetchall()]
-    
-    for course_id in course_ids:
-        for user_id in user_ids:
-            cursor.execute(
-                "INSERT INTO enrollments (course_id, user_id) VALUES (?, ?)",
-                (course_id, user_id)
-            )
-    
-    conn.commit()
-    conn.close()
+        
+        # Enroll all users in all courses, without reading the new ids back
+        cursor.execute(
+            "INSERT INTO enrollments (course_id, user_id) SELECT c.id, u.id FROM courses c CROSS JOIN users u"
+        )
+        
+        conn.commit()
+
+
+def prepare_database():
+    """Create the schema and demo data unless the database is already at SCHEMA_VERSION."""
+    with get_db() as conn:
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+    init_db()
+    seed_demo_data()
+    with get_db(write=True) as conn:
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
 
 # OAuth 1.0a Implementation
+
+# RFC 3986 unreserved characters; everything else is percent-encoded.
+_UNRESERVED = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~"
+_QUOTE_TABLE = [bytes([b]) if b in _UNRESERVED else b"%%%02X" % b for b in range(256)]
+
+
+def _quote(data: bytes) -> bytes:
+    """Percent-encode bytes the way urllib.parse.quote_from_bytes(data, safe='') does."""
+    # Most LTI keys and values (ids, timestamps, nonces) need no escaping at all
+    if not data.translate(None, _UNRESERVED):
+        return data
+    return b"".join([_QUOTE_TABLE[b] for b in data])
+
+
+# _quote applied twice: escaped bytes become %25XX. The signature base string
+# encodes the already-encoded parameter string, so this builds it in one pass.
+_QUOTE_TWICE_TABLE = [_quote(_quote(bytes([b]))) for b in range(256)]
+
+
+def _quote_twice(data: bytes) -> bytes:
+    """Equivalent to _quote(_quote(data)), in a single pass."""
+    if not data.translate(None, _UNRESERVED):
+        return data
+    return b"".join([_QUOTE_TWICE_TABLE[b] for b in data])
+
+
 def generate_oauth_signature(method: str, url: str, params: dict, consumer_secret: str) -> str:
     """Generate OAuth 1.0a signature for LTI launch."""
     # Sort parameters
     sorted_params = sorted(params.items())
     
-    # Create parameter string
-    param_string = "&".join(
-        f"{urllib.parse.quote(str(k), safe='')}"
-        f"={urllib.parse.quote(str(v), safe='')}"
-        for k, v in sorted_params
-    )
-    
-    # Create signature base string
-    signature_base = "&".join([
-        method.upper(),
-        urllib.parse.quote(url, safe=''),
-        urllib.parse.quote(param_string, safe='')
+    # Create signature base string. The parameter section is quote(k=v&k=v...),
+    # i.e. each key and value encoded twice joined by an encoded "=" and "&".
+    # Everything stays bytes from here to the HMAC.
+    signature_base = b"&".join([
+        method.upper().encode("ascii"),
+        _quote(url.encode("utf-8")),
+        b"%26".join([
+            _quote_twice(str(k).encode("utf-8")) + b"%3D" + _quote_twice(str(v).encode("utf-8"))
+            for k, v in sorted_params
+        ])
     ])
     
-    # Debug: Print signature base string (helps debug mismatches)
-    print(f"DEBUG OAuth - Method: {method}")
-    print(f"DEBUG OAuth - URL: {url}")
-    print(f"DEBUG OAuth - Signature Base String (first 500 chars): {signature_base[:500]}...")
+    # Debug: log signature base string (helps debug mismatches)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("OAuth - Method: %s", method)
+        logger.debug("OAuth - URL: %s", url)
+        logger.debug("OAuth - Signature Base String (first 500 chars): %s...", signature_base[:500].decode("ascii"))
     
     # Create signing key (consumer_secret + "&" + token_secret, but token_secret is empty for LTI)
-    signing_key = f"{urllib.parse.quote(consumer_secret, safe='')}&"
+    signing_key = _quote(consumer_secret.encode("utf-8")) + b"&"
     
-    # Generate HMAC-SHA1 signature
-    hashed = hmac.new(
-        signing_key.encode('utf-8'),
-        signature_base.encode('utf-8'),
-        hashlib.sha1
-    )
-    signature = base64.b64encode(hashed.digest()).decode('utf-8')
+    # Generate HMAC-SHA1 signature (one-shot OpenSSL call)
+    digest = hmac.digest(signing_key, signature_base, 'sha1')
+    signature = base64.b64encode(digest).decode('ascii')
     
-    print(f"DEBUG OAuth - Generated Signature: {signature}")
+    logger.debug("OAuth - Generated Signature: %s", signature)
     
     return signature
 
 
+# Launch parameters that are the same for every launch
+_LTI_STATIC_PARAMS = {
+    # LTI Required
+    "lti_message_type": "basic-lti-launch-request",
+    "lti_version": "LTI-1p0",
+    
+    # OAuth
+    "oauth_signature_method": "HMAC-SHA1",
+    "oauth_version": "1.0",
+    "oauth_callback": "about:blank",
+    
+    # Context (Course)
+    "context_type": "CourseSection",
+    
+    # Launch presentation
+    "launch_presentation_locale": "en-US",
+    "launch_presentation_document_target": "iframe",
+    
+    # Tool consumer info
+    "tool_consumer_instance_guid": "lti-test-platform.local",
+    "tool_consumer_instance_name": "LTI Test Platform",
+    "tool_consumer_instance_description": "Local LTI 1.1 Testing Environment",
+    "tool_consumer_info_product_family_code": "lti-test-platform",
+    "tool_consumer_info_version": "1.0",
+}
+
+# Platform role -> LTI role (anything that is not a teacher launches as a Learner)
+_LTI_ROLES = {"teacher": "Instructor", "student": "Learner"}
+
+
 def build_lti_launch_params(
     tool: dict,
     course: dict,
@@ -273,37 +500,30 @@ def build_lti_launch_params(
     receives the request. This is critical for OAuth signature verification.
     """
     
-    # Determine LTI role
-    if user['role'] == 'teacher':
-        lti_role = "Instructor"
-    else:
-        lti_role = "Learner"
-    
     # Generate unique identifiers
     sourced_id = base64.b64encode(
         f"{course['id']}:{resource_link_id}:{user['id']}".encode()
     ).decode()
     
     timestamp = str(int(time.time()))
-    nonce = str(uuid.uuid4())
+    nonce = secrets.token_hex(16)
     
     # Debug logging
-    print(f"DEBUG: Building LTI params for launch_url = {launch_url}")
-    print(f"DEBUG: Consumer key = {tool['consumer_key']}")
-    print(f"DEBUG: Timestamp = {timestamp}, Nonce = {nonce}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Building LTI params for launch_url = %s", launch_url)
+        logger.debug("Consumer key = %s", tool['consumer_key'])
+        logger.debug("Timestamp = %s, Nonce = %s", timestamp, nonce)
+    
+    full_name = user['name']
+    name_parts = full_name.split()
     
     params = {
-        # LTI Required
-        "lti_message_type": "basic-lti-launch-request",
-        "lti_version": "LTI-1p0",
+        **_LTI_STATIC_PARAMS,
         
         # OAuth
         "oauth_consumer_key": tool['consumer_key'],
-        "oauth_signature_method": "HMAC-SHA1",
         "oauth_timestamp": timestamp,
         "oauth_nonce": nonce,
-        "oauth_version": "1.0",
-        "oauth_callback": "about:blank",
         
         # Resource
         "resource_link_id": resource_link_id,
@@ -313,30 +533,18 @@ def build_lti_launch_params(
         "context_id": str(course['id']),
         "context_label": course['code'],
         "context_title": course['name'],
-        "context_type": "CourseSection",
         
         # User
         "user_id": str(user['id']),
-        "lis_person_name_given": user['name'].split()[0],
-        "lis_person_name_family": " ".join(user['name'].split()[1:]) or user['name'],
-        "lis_person_name_full": user['name'],
+        "lis_person_name_given": name_parts[0],
+        "lis_person_name_family": " ".join(name_parts[1:]) or full_name,
+        "lis_person_name_full": full_name,
         "lis_person_contact_email_primary": user['email'],
-        "roles": lti_role,
+        "roles": _LTI_ROLES.get(user['role'], "Learner"),
         
         # Outcomes service
         "lis_outcome_service_url": outcomes_url,
         "lis_result_sourcedid": sourced_id,
-        
-        # Launch presentation
-        "launch_presentation_locale": "en-US",
-        "launch_presentation_document_target": "iframe",
-        
-        # Tool consumer info
-        "tool_consumer_instance_guid": "lti-test-platform.local",
-        "tool_consumer_instance_name": "LTI Test Platform",
-        "tool_consumer_instance_description": "Local LTI 1.1 Testing Environment",
-        "tool_consumer_info_product_family_code": "lti-test-platform",
-        "tool_consumer_info_version": "1.0",
     }
     
     # Add custom parameters
@@ -352,13 +560,6 @@ def build_lti_launch_params(
     return params
 
 
-# Initialize database on startup
-@app.on_event("startup")
-async def startup():
-    init_db()
-    seed_demo_data()
-
-
 # HTML Template (embedded for simplicity)
 def get_base_template():
     return """
@@ -369,459 +570,7 @@ def get_base_template():
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>LTI 1.1 Test Platform</title>
     <link href="https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@400;500;600&family=Space+Grotesk:wght@400;500;600;700&display=swap" rel="stylesheet">
-    <style>
-        :root {
-            --bg-primary: #0a0a0f;
-            --bg-secondary: #12121a;
-            --bg-tertiary: #1a1a25;
-            --accent: #6366f1;
-            --accent-hover: #818cf8;
-            --success: #10b981;
-            --warning: #f59e0b;
-            --danger: #ef4444;
-            --text-primary: #f8fafc;
-            --text-secondary: #94a3b8;
-            --text-muted: #64748b;
-            --border: #2d2d3a;
-            --radius: 8px;
-        }
-        
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: 'Space Grotesk', sans-serif;
-            background: var(--bg-primary);
-            color: var(--text-primary);
-            min-height: 100vh;
-            line-height: 1.6;
-        }
-        
-        .container {
-            max-width: 1400px;
-            margin: 0 auto;
-            padding: 2rem;
-        }
-        
-        header {
-            background: linear-gradient(135deg, var(--bg-secondary) 0%, var(--bg-tertiary) 100%);
-            border-bottom: 1px solid var(--border);
-            padding: 1.5rem 2rem;
-            margin-bottom: 2rem;
-        }
-        
-        header h1 {
-            font-size: 1.75rem;
-            font-weight: 700;
-            background: linear-gradient(135deg, var(--accent) 0%, var(--accent-hover) 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-        }
-        
-        header p {
-            color: var(--text-secondary);
-            font-size: 0.9rem;
-            margin-top: 0.25rem;
-        }
-        
-        nav {
-            display: flex;
-            gap: 0.5rem;
-            margin-top: 1rem;
-            flex-wrap: wrap;
-        }
-        
-        nav a {
-            padding: 0.5rem 1rem;
-            background: var(--bg-tertiary);
-            color: var(--text-secondary);
-            text-decoration: none;
-            border-radius: var(--radius);
-            font-size: 0.85rem;
-            font-weight: 500;
-            transition: all 0.2s;
-            border: 1px solid var(--border);
-        }
-        
-        nav a:hover, nav a.active {
-            background: var(--accent);
-            color: white;
-            border-color: var(--accent);
-        }
-        
-        .card {
-            background: var(--bg-secondary);
-            border: 1px solid var(--border);
-            border-radius: var(--radius);
-            padding: 1.5rem;
-            margin-bottom: 1.5rem;
-        }
-        
-        .card-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 1rem;
-            padding-bottom: 1rem;
-            border-bottom: 1px solid var(--border);
-        }
-        
-        .card-title {
-            font-size: 1.1rem;
-            font-weight: 600;
-        }
-        
-        .grid {
-            display: grid;
-            gap: 1.5rem;
-        }
-        
-        .grid-2 { grid-template-columns: repeat(auto-fit, minmax(400px, 1fr)); }
-        .grid-3 { grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); }
-        
-        table {
-            width: 100%;
-            border-collapse: collapse;
-        }
-        
-        th, td {
-            text-align: left;
-            padding: 0.75rem;
-            border-bottom: 1px solid var(--border);
-        }
-        
-        th {
-            color: var(--text-secondary);
-            font-weight: 500;
-            font-size: 0.85rem;
-            text-transform: uppercase;
-            letter-spacing: 0.05em;
-        }
-        
-        td {
-            font-size: 0.9rem;
-        }
-        
-        tr:hover {
-            background: var(--bg-tertiary);
-        }
-        
-        .btn {
-            display: inline-flex;
-            align-items: center;
-            gap: 0.5rem;
-            padding: 0.5rem 1rem;
-            border-radius: var(--radius);
-            font-size: 0.85rem;
-            font-weight: 500;
-            text-decoration: none;
-            border: none;
-            cursor: pointer;
-            transition: all 0.2s;
-            font-family: inherit;
-        }
-        
-        .btn-primary {
-            background: var(--accent);
-            color: white;
-        }
-        
-        .btn-primary:hover {
-            background: var(--accent-hover);
-        }
-        
-        .btn-secondary {
-            background: var(--bg-tertiary);
-            color: var(--text-secondary);
-            border: 1px solid var(--border);
-        }
-        
-        .btn-secondary:hover {
-            background: var(--border);
-            color: var(--text-primary);
-        }
-        
-        .btn-success {
-            background: var(--success);
-            color: white;
-        }
-        
-        .btn-danger {
-            background: var(--danger);
-            color: white;
-        }
-        
-        .btn-sm {
-            padding: 0.35rem 0.75rem;
-            font-size: 0.8rem;
-        }
-        
-        .form-group {
-            margin-bottom: 1rem;
-        }
-        
-        label {
-            display: block;
-            margin-bottom: 0.5rem;
-            color: var(--text-secondary);
-            font-size: 0.85rem;
-            font-weight: 500;
-        }
-        
-        input, textarea, select {
-            width: 100%;
-            padding: 0.75rem;
-            background: var(--bg-tertiary);
-            border: 1px solid var(--border);
-            border-radius: var(--radius);
-            color: var(--text-primary);
-            font-size: 0.9rem;
-            font-family: inherit;
-            transition: border-color 0.2s;
-        }
-        
-        input:focus, textarea:focus, select:focus {
-            outline: none;
-            border-color: var(--accent);
-        }
-        
-        textarea {
-            min-height: 100px;
-            resize: vertical;
-        }
-        
-        .badge {
-            display: inline-block;
-            padding: 0.25rem 0.5rem;
-            border-radius: 4px;
-            font-size: 0.75rem;
-            font-weight: 500;
-            text-transform: uppercase;
-        }
-        
-        .badge-teacher {
-            background: rgba(99, 102, 241, 0.2);
-            color: var(--accent-hover);
-        }
-        
-        .badge-student {
-            background: rgba(16, 185, 129, 0.2);
-            color: var(--success);
-        }
-        
-        .code-block {
-            background: var(--bg-primary);
-            border: 1px solid var(--border);
-            border-radius: var(--radius);
-            padding: 1rem;
-            overflow-x: auto;
-            font-family: 'JetBrains Mono', monospace;
-            font-size: 0.8rem;
-            max-height: 400px;
-            overflow-y: auto;
-        }
-        
-        .code-block pre {
-            white-space: pre-wrap;
-            word-wrap: break-word;
-        }
-        
-        .tabs {
-            display: flex;
-            gap: 0.25rem;
-            margin-bottom: 1rem;
-            border-bottom: 1px solid var(--border);
-        }
-        
-        .tab {
-            padding: 0.75rem 1.25rem;
-            background: transparent;
-            color: var(--text-secondary);
-            border: none;
-            cursor: pointer;
-            font-size: 0.9rem;
-            font-weight: 500;
-            font-family: inherit;
-            border-bottom: 2px solid transparent;
-            margin-bottom: -1px;
-            transition: all 0.2s;
-        }
-        
-        .tab:hover {
-            color: var(--text-primary);
-        }
-        
-        .tab.active {
-            color: var(--accent);
-            border-bottom-color: var(--accent);
-        }
-        
-        .tab-content {
-            display: none;
-        }
-        
-        .tab-content.active {
-            display: block;
-        }
-        
-        .alert {
-            padding: 1rem;
-            border-radius: var(--radius);
-            margin-bottom: 1rem;
-        }
-        
-        .alert-info {
-            background: rgba(99, 102, 241, 0.1);
-            border: 1px solid var(--accent);
-            color: var(--accent-hover);
-        }
-        
-        .alert-success {
-            background: rgba(16, 185, 129, 0.1);
-            border: 1px solid var(--success);
-            color: var(--success);
-        }
-        
-        .user-selector {
-            display: flex;
-            gap: 0.5rem;
-            flex-wrap: wrap;
-            margin-bottom: 1rem;
-        }
-        
-        .user-card {
-            padding: 0.75rem 1rem;
-            background: var(--bg-tertiary);
-            border: 2px solid var(--border);
-            border-radius: var(--radius);
-            cursor: pointer;
-            transition: all 0.2s;
-        }
-        
-        .user-card:hover {
-            border-color: var(--accent);
-        }
-        
-        .user-card.selected {
-            border-color: var(--accent);
-            background: rgba(99, 102, 241, 0.1);
-        }
-        
-        .user-card .name {
-            font-weight: 500;
-            font-size: 0.9rem;
-        }
-        
-        .user-card .role {
-            font-size: 0.75rem;
-            color: var(--text-muted);
-        }
-        
-        .launch-frame {
-            width: 100%;
-            height: 600px;
-            border: 1px solid var(--border);
-            border-radius: var(--radius);
-            background: white;
-        }
-        
-        .empty-state {
-            text-align: center;
-            padding: 3rem;
-            color: var(--text-muted);
-        }
-        
-        .empty-state h3 {
-            margin-bottom: 0.5rem;
-            color: var(--text-secondary);
-        }
-        
-        .flex {
-            display: flex;
-            gap: 1rem;
-            align-items: center;
-        }
-        
-        .flex-between {
-            justify-content: space-between;
-        }
-        
-        .mt-1 { margin-top: 0.5rem; }
-        .mt-2 { margin-top: 1rem; }
-        .mb-1 { margin-bottom: 0.5rem; }
-        .mb-2 { margin-bottom: 1rem; }
-        
-        .text-muted { color: var(--text-muted); }
-        .text-success { color: var(--success); }
-        .text-danger { color: var(--danger); }
-        
-        .score {
-            font-size: 1.25rem;
-            font-weight: 600;
-        }
-        
-        .inline-form {
-            display: flex;
-            gap: 0.5rem;
-            align-items: flex-end;
-        }
-        
-        .inline-form .form-group {
-            margin-bottom: 0;
-            flex: 1;
-        }
-        
-        .modal {
-            display: none;
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: rgba(0, 0, 0, 0.8);
-            z-index: 1000;
-            align-items: center;
-            justify-content: center;
-        }
-        
-        .modal.active {
-            display: flex;
-        }
-        
-        .modal-content {
-            background: var(--bg-secondary);
-            border: 1px solid var(--border);
-            border-radius: var(--radius);
-            padding: 2rem;
-            max-width: 600px;
-            width: 90%;
-            max-height: 90vh;
-            overflow-y: auto;
-        }
-        
-        .modal-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 1.5rem;
-        }
-        
-        .modal-close {
-            background: none;
-            border: none;
-            color: var(--text-muted);
-            font-size: 1.5rem;
-            cursor: pointer;
-        }
-        
-        .modal-close:hover {
-            color: var(--text-primary);
-        }
-    </style>
+    <link rel="stylesheet" href="/static/app.css?v={{asset_version}}">
 </head>
 <body>
     <header>
@@ -846,116 +595,355 @@ def get_base_template():
     <div class="container">
         {{content}}
     </div>
-    <script>
-        function showTab(tabId) {
-            document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
-            document.querySelectorAll('.tab-content').forEach(c => c.classList.remove('active'));
-            document.querySelector(`[data-tab="${tabId}"]`).classList.add('active');
-            document.getElementById(tabId).classList.add('active');
-        }
-        
-        function selectUser(userId, element) {
-            document.querySelectorAll('.user-card').forEach(c => c.classList.remove('selected'));
-            element.classList.add('selected');
-            document.getElementById('selected_user_id').value = userId;
-        }
-        
-        function openModal(modalId) {
-            document.getElementById(modalId).classList.add('active');
-        }
-        
-        function closeModal(modalId) {
-            document.getElementById(modalId).classList.remove('active');
-        }
-        
-        function confirmDelete(url, name) {
-            if (confirm(`Are you sure you want to delete "${name}"?`)) {
-                window.location.href = url;
-            }
-        }
-    </script>
+    <script src="/static/app.js?v={{asset_version}}"></script>
 </body>
 </html>
 """
 
 
-def render_template(content: str, active_page: str = "dashboard") -> str:
-    template = get_base_template()
-    template = template.replace("{{content}}", content)
-    template = template.replace("{{'active' if active_page == 'dashboard' else ''}}", 
-                                "active" if active_page == "dashboard" else "")
-    template = template.replace("{{'active' if active_page == 'tool-servers' else ''}}", 
-                                "active" if active_page == "tool-servers" else "")
-    template = template.replace("{{'active' if active_page == 'tools' else ''}}", 
-                                "active" if active_page == "tools" else "")
-    template = template.replace("{{'active' if active_page == 'courses' else ''}}", 
-                                "active" if active_page == "courses" else "")
-    template = template.replace("{{'active' if active_page == 'launch-logs' else ''}}", 
-                                "active" if active_page == "launch-logs" else "")
-    template = template.replace("{{'active' if active_page == 'grades' else ''}}", 
-                                "active" if active_page == "grades" else "")
+NAV_PAGES = ("dashboard", "tool-servers", "tools", "courses", "launch-logs", "grades")
+
+
+def _build_base_template(active_page: str) -> str:
+    """Resolve the nav 'active' markers of the base template for one page."""
+    template = get_base_template().replace("{{asset_version}}", ASSET_VERSION)
+    for page in NAV_PAGES:
+        template = template.replace(f"{{{{'active' if active_page == '{page}' else ''}}}}",
+                                    "active" if active_page == page else "")
     return template
 
 
+# The shell only depends on the active page, so each half is built and
+# UTF-8 encoded once; only the content is encoded per request.
+@lru_cache(maxsize=16)
+def _shell_prefix(active_page: str) -> bytes:
+    return _build_base_template(active_page).split("{{content}}", 1)[0].encode()
+
+
+@lru_cache(maxsize=1)
+def _shell_suffix() -> bytes:
+    # Everything after the content is the same on every page
+    return _build_base_template("").split("{{content}}", 1)[1].encode()
+
+
+def render_template(content: str, active_page: str = "dashboard") -> bytes:
+    return _shell_prefix(active_page) + content.encode() + _shell_suffix()
+
+
+def stream_template(active_page: str, *chunks: str,
+                    headers: Optional[dict] = None) -> StreamingResponse:
+    """Stream the page shell around content chunks instead of joining one big string."""
+    # An async generator, so Starlette sends each chunk from the event loop
+    # instead of a threadpool hop per chunk
+    async def body():
+        yield _shell_prefix(active_page)
+        for chunk in chunks:
+            yield chunk
+        yield _shell_suffix()
+    return StreamingResponse(body(), media_type="text/html", headers=headers)
+
+
+# ============== COURSE PAGE CACHE ==============
+# The course page is the most visited one, and its user and tool lists only
+# change when tools or a course's tools are edited. They are kept for a few
+# seconds; the write routes drop them straight away.
+
+COURSE_CACHE_TTL = 5.0
+COURSE_CACHE_SIZE = 256
+_course_cache: dict = {}
+_course_cache_lock = threading.Lock()
+
+
+def _cached_course_rows(course_id: int):
+    """Return (users, tool_rows) for a course if cached and fresh, else None."""
+    with _course_cache_lock:
+        entry = _course_cache.get(course_id)
+    if entry and entry[0] > time.monotonic():
+        return entry[1], entry[2]
+    return None
+
+
+def _cache_course_rows(course_id: int, users: list, tool_rows: list):
+    with _course_cache_lock:
+        if len(_course_cache) >= COURSE_CACHE_SIZE:
+            _course_cache.clear()
+        _course_cache[course_id] = (time.monotonic() + COURSE_CACHE_TTL, users, tool_rows)
+
+
+def invalidate_course_cache(course_id: Optional[int] = None):
+    """Forget one course's cached rows, or every course's when no id is given."""
+    with _course_cache_lock:
+        if course_id is None:
+            _course_cache.clear()
+        else:
+            _course_cache.pop(course_id, None)
+
+
+# ============== SQL ==============
+# Every statement the routes run, kept as module constants so each pooled
+# connection's statement cache reuses the compiled statement.
+
+SELECT_DASHBOARD_COUNTS_SQL = """
+    SELECT (SELECT COUNT(*) FROM tool_servers),
+           (SELECT COUNT(*) FROM tools),
+           (SELECT COUNT(*) FROM courses),
+           (SELECT COUNT(*) FROM launch_logs),
+           (SELECT COUNT(*) FROM grade_results)
+"""
+
+SELECT_RECENT_LAUNCHES_SQL = """
+    SELECT ll.id, ll.launched_at, u.name as user_name, u.role as user_role,
+           t.name as tool_name, c.name as course_name
+    FROM launch_logs ll
+    JOIN users u ON ll.user_id = u.id
+    JOIN course_tools ct ON ll.course_tool_id = ct.id
+    JOIN tools t ON ct.tool_id = t.id
+    JOIN courses c ON ct.course_id = c.id
+    ORDER BY ll.launched_at DESC, ll.id DESC
+    LIMIT 5
+"""
+
+SELECT_TOOL_SERVERS_SQL = "SELECT * FROM tool_servers ORDER BY created_at DESC"
+
+INSERT_TOOL_SERVER_SQL = "INSERT INTO tool_servers (name, domain, port, description) VALUES (?, ?, ?, ?)"
+
+SELECT_TOOL_SERVER_SQL = "SELECT * FROM tool_servers WHERE id = ?"
+
+UPDATE_TOOL_SERVER_SQL = "UPDATE tool_servers SET name = ?, domain = ?, port = ?, description = ? WHERE id = ?"
+
+DELETE_TOOL_SERVER_SQL = "DELETE FROM tool_servers WHERE id = ?"
+
+SELECT_TOOLS_SQL = """
+    SELECT t.*, ts.name as server_name, ts.domain, ts.port
+    FROM tools t
+    JOIN tool_servers ts ON t.tool_server_id = ts.id
+    ORDER BY t.created_at DESC
+"""
+
+SELECT_TOOL_SERVER_OPTIONS_SQL = "SELECT * FROM tool_servers"
+
+INSERT_TOOL_SQL = """
+    INSERT INTO tools
+        (tool_server_id, name, launch_path, consumer_key, consumer_secret, custom_params, description, launch_url_override)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SELECT_TOOL_SQL = "SELECT * FROM tools WHERE id = ?"
+
+UPDATE_TOOL_SQL = """
+    UPDATE tools SET
+        tool_server_id = ?, name = ?, launch_path = ?, consumer_key = ?,
+        consumer_secret = ?, custom_params = ?, description = ?, launch_url_override = ?
+    WHERE id = ?
+"""
+
+DELETE_TOOL_SQL = "DELETE FROM tools WHERE id = ?"
+
+SELECT_COURSES_SQL = "SELECT * FROM courses ORDER BY created_at DESC"
+
+SELECT_COURSE_SQL = "SELECT * FROM courses WHERE id = ?"
+
+SELECT_COURSE_USERS_SQL = """
+    SELECT u.* FROM users u
+    JOIN enrollments e ON u.id = e.user_id
+    WHERE e.course_id = ?
+    ORDER BY u.role, u.name
+"""
+
+SELECT_COURSE_TOOLS_SQL = """
+    SELECT ct.id IS NOT NULL AS attached, COALESCE(ct.id, t.id) AS id,
+           t.name AS tool_name, ts.name AS server_name,
+           ct.resource_link_id, t.launch_path, ts.domain, ts.port
+    FROM tools t
+    JOIN tool_servers ts ON t.tool_server_id = ts.id
+    LEFT JOIN course_tools ct ON ct.tool_id = t.id AND ct.course_id = ?
+    ORDER BY attached DESC, id
+"""
+
+# The tool's name becomes the resource link title; an unknown tool inserts nothing
+INSERT_COURSE_TOOL_SQL = """
+    INSERT INTO course_tools (course_id, tool_id, resource_link_id, resource_link_title)
+    SELECT ?, id, ?, name FROM tools WHERE id = ?
+"""
+
+DELETE_COURSE_TOOL_SQL = "DELETE FROM course_tools WHERE id = ? AND course_id = ?"
+
+INSERT_LAUNCH_LOG_SQL = """
+    INSERT INTO launch_logs
+        (course_tool_id, user_id, launch_params, signed_params, oauth_signature)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+SELECT_LAUNCH_COURSE_TOOL_SQL = """
+    SELECT ct.resource_link_id, ct.resource_link_title,
+           t.name, t.launch_path, t.consumer_key, t.consumer_secret,
+           t.custom_params, t.launch_url_override,
+           ts.domain, ts.port,
+           c.id as course_id, c.name as course_name, c.code as course_code
+    FROM course_tools ct
+    JOIN tools t ON ct.tool_id = t.id
+    JOIN tool_servers ts ON t.tool_server_id = ts.id
+    JOIN courses c ON ct.course_id = c.id
+    WHERE ct.id = ?
+"""
+
+SELECT_LAUNCH_USER_SQL = "SELECT id, name, email, role FROM users WHERE id = ?"
+
+# Newest first, one page at a time; the "before" variant continues after the
+# row with the given id. Where JSON_ORDERED_PAGES allows, the page comes back
+# as a single JSON array of row objects rather than one sqlite3.Row per row;
+# the aggregate repeats the ORDER BY since it doesn't keep the subquery's.
+_LAUNCH_LOGS_PAGE_SQL = """
+    SELECT ll.id, ll.launched_at, u.name as user_name, u.role as user_role,
+           t.name as tool_name, c.name as course_name
+    FROM launch_logs ll
+    JOIN users u ON ll.user_id = u.id
+    JOIN course_tools ct ON ll.course_tool_id = ct.id
+    JOIN tools t ON ct.tool_id = t.id
+    JOIN courses c ON ct.course_id = c.id
+    {where}
+    ORDER BY ll.launched_at DESC, ll.id DESC
+    LIMIT ?
+"""
+if JSON_ORDERED_PAGES:
+    _LAUNCH_LOGS_PAGE_SQL = """
+    SELECT json_group_array(json_object(
+        'id', id, 'launched_at', launched_at,
+        'user_name', user_name, 'user_role', user_role,
+        'tool_name', tool_name, 'course_name', course_name
+    ) ORDER BY launched_at DESC, id DESC)
+    FROM (""" + _LAUNCH_LOGS_PAGE_SQL + ")"
+SELECT_LAUNCH_LOGS_SQL = _LAUNCH_LOGS_PAGE_SQL.format(where="")
+SELECT_LAUNCH_LOGS_BEFORE_SQL = _LAUNCH_LOGS_PAGE_SQL.format(
+    where="WHERE (ll.launched_at, ll.id) < (SELECT launched_at, id FROM launch_logs WHERE id = ?)"
+)
+
+# Changes whenever a launch is added (or the newest one removed) or the tool
+# catalog changes; each MAX is answered from an index on its own
+SELECT_LAUNCH_LOGS_VERSION_SQL = """
+    SELECT (SELECT MAX(id) FROM launch_logs),
+           (SELECT MAX(launched_at) FROM launch_logs),
+           (SELECT generation FROM catalog_version)
+"""
+
+SELECT_LAUNCH_LOG_SQL = """
+    SELECT ll.*, u.name as user_name, u.role as user_role, u.email as user_email,
+           t.name as tool_name, t.launch_path, t.consumer_key, t.consumer_secret,
+           ts.domain, ts.port,
+           c.name as course_name, c.code as course_code
+    FROM launch_logs ll
+    JOIN users u ON ll.user_id = u.id
+    JOIN course_tools ct ON ll.course_tool_id = ct.id
+    JOIN tools t ON ct.tool_id = t.id
+    JOIN tool_servers ts ON t.tool_server_id = ts.id
+    JOIN courses c ON ct.course_id = c.id
+    WHERE ll.id = ?
+"""
+
+# Inserts nothing when the sourcedId's course tool or user no longer exists,
+# so one stale sourcedId cannot fail the foreign key check for a whole batch
+INSERT_GRADE_RESULT_SQL = """
+    INSERT INTO grade_results
+        (course_tool_id, user_id, sourced_id, score, raw_xml, pretty_xml)
+    SELECT id, ?, ?, ?, ?, ?
+    FROM course_tools
+    WHERE course_id = ? AND resource_link_id = ?
+      AND EXISTS (SELECT 1 FROM users WHERE id = ?)
+"""
+
+_GRADE_RESULTS_PAGE_SQL = """
+    SELECT gr.id, gr.received_at, gr.score, u.name as user_name, u.role as user_role,
+           t.name as tool_name, c.name as course_name
+    FROM grade_results gr
+    JOIN users u ON gr.user_id = u.id
+    JOIN course_tools ct ON gr.course_tool_id = ct.id
+    JOIN tools t ON ct.tool_id = t.id
+    JOIN courses c ON ct.course_id = c.id
+    {where}
+    ORDER BY gr.received_at DESC, gr.id DESC
+    LIMIT ?
+"""
+if JSON_ORDERED_PAGES:
+    _GRADE_RESULTS_PAGE_SQL = """
+    SELECT json_group_array(json_object(
+        'id', id, 'received_at', received_at, 'score', score,
+        'user_name', user_name, 'user_role', user_role,
+        'tool_name', tool_name, 'course_name', course_name
+    ) ORDER BY received_at DESC, id DESC)
+    FROM (""" + _GRADE_RESULTS_PAGE_SQL + ")"
+SELECT_GRADE_RESULTS_SQL = _GRADE_RESULTS_PAGE_SQL.format(where="")
+SELECT_GRADE_RESULTS_BEFORE_SQL = _GRADE_RESULTS_PAGE_SQL.format(
+    where="WHERE (gr.received_at, gr.id) < (SELECT received_at, id FROM grade_results WHERE id = ?)"
+)
+
+SELECT_GRADE_RESULTS_VERSION_SQL = """
+    SELECT (SELECT MAX(id) FROM grade_results),
+           (SELECT MAX(received_at) FROM grade_results),
+           (SELECT generation FROM catalog_version)
+"""
+
+SELECT_GRADE_RESULT_SQL = """
+    SELECT gr.*, u.name as user_name, u.role as user_role,
+           t.name as tool_name, c.name as course_name
+    FROM grade_results gr
+    JOIN users u ON gr.user_id = u.id
+    JOIN course_tools ct ON gr.course_tool_id = ct.id
+    JOIN tools t ON ct.tool_id = t.id
+    JOIN courses c ON ct.course_id = c.id
+    WHERE gr.id = ?
+"""
+
+
 # ============== ROUTES ==============
 
-@app.get("/", response_class=HTMLResponse)
-async def dashboard():
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    # Get counts
-    cursor.execute("SELECT COUNT(*) FROM tool_servers")
-    server_count = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM tools")
-    tool_count = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM courses")
-    course_count = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM launch_logs")
-    launch_count = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM grade_results")
-    grade_count = cursor.fetchone()[0]
-    
-    # Recent launches
-    cursor.execute("""
-        SELECT ll.*, u.name as user_name, u.role as user_role,
-               t.name as tool_name, c.name as course_name
-        FROM launch_logs ll
-        JOIN users u ON ll.user_id = u.id
-        JOIN course_tools ct ON ll.course_tool_id = ct.id
-        JOIN tools t ON ct.tool_id = t.id
-        JOIN courses c ON ct.course_id = c.id
-        ORDER BY ll.launched_at DESC
-        LIMIT 5
-    """)
-    recent_launches = cursor.fetchall()
-    
-    conn.close()
-    
-    launches_html = ""
-    for launch in recent_launches:
-        role_badge = "badge-teacher" if launch['user_role'] == 'teacher' else "badge-student"
-        launches_html += f"""
+# Badge class per user role; anything that is not a teacher shows as a student
+_ROLE_BADGES = {'teacher': 'badge-teacher'}
+
+# One row of the dashboard's recent launches table
+_DASHBOARD_LAUNCH_ROW = """
         <tr>
-            <td>{launch['launched_at']}</td>
-            <td>{launch['course_name']}</td>
-            <td>{launch['tool_name']}</td>
+            <td>{launched_at}</td>
+            <td>{course_name}</td>
+            <td>{tool_name}</td>
             <td>
-                {launch['user_name']}
-                <span class="badge {role_badge}">{launch['user_role']}</span>
+                {user_name}
+                <span class="badge {role_badge}">{user_role}</span>
             </td>
             <td>
-                <a href="/launch-logs/{launch['id']}" class="btn btn-sm btn-secondary">View</a>
+                <a href="/launch-logs/{id}" class="btn btn-sm btn-secondary">View</a>
             </td>
         </tr>
-        """
-    
-    if not launches_html:
-        launches_html = '<tr><td colspan="5" class="text-muted">No launches yet</td></tr>'
+        """.format
+
+
+@app.get("/", response_class=HTMLResponse)
+def dashboard():
+    with get_db() as conn:
+        cursor = conn.cursor()
+    
+        # Get counts (plain tuples; no need for named access here)
+        counts = conn.cursor()
+        counts.row_factory = None
+        counts.execute(SELECT_DASHBOARD_COUNTS_SQL)
+        server_count, tool_count, course_count, launch_count, grade_count = counts.fetchone()
+    
+        # Recent launches
+        cursor.execute(SELECT_RECENT_LAUNCHES_SQL)
+        recent_launches = cursor.fetchall()
+    
+    rows = []
+    append = rows.append
+    for launch in recent_launches:
+        append(_DASHBOARD_LAUNCH_ROW(
+            id=launch['id'],
+            launched_at=launch['launched_at'],
+            course_name=escape(launch['course_name']),
+            tool_name=escape(launch['tool_name']),
+            user_name=escape(launch['user_name']),
+            user_role=escape(launch['user_role']),
+            role_badge=_ROLE_BADGES.get(launch['user_role'], 'badge-student'),
+        ))
+    launches_html = "".join(rows) or '<tr><td colspan="5" class="text-muted">No launches yet</td></tr>'
     
     content = f"""
     <div class="grid grid-3">
@@ -1025,32 +1013,30 @@ async def dashboard():
 # ============== TOOL SERVERS ==============
 
 @app.get("/tool-servers", response_class=HTMLResponse)
-async def list_tool_servers():
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM tool_servers ORDER BY created_at DESC")
-    servers = cursor.fetchall()
-    conn.close()
-    
-    servers_html = ""
+def list_tool_servers():
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SELECT_TOOL_SERVERS_SQL)
+        servers = cursor.fetchall()
+    
+    rows = []
     for server in servers:
-        servers_html += f"""
+        rows.append(f"""
         <tr>
-            <td><strong>{server['name']}</strong></td>
-            <td><code>{server['domain']}:{server['port']}</code></td>
-            <td>{server['description'] or '-'}</td>
+            <td><strong>{escape(server['name'])}</strong></td>
+            <td><code>{escape(server['domain'])}:{server['port']}</code></td>
+            <td>{escape(server['description'] or '-')}</td>
             <td>
                 <a href="/tool-servers/{server['id']}/edit" class="btn btn-sm btn-secondary">Edit</a>
-                <button onclick="confirmDelete('/tool-servers/{server['id']}/delete', '{server['name']}')" 
+                <button onclick="confirmDelete('/tool-servers/{server['id']}/delete', {escape(json.dumps(server['name']))})" 
                         class="btn btn-sm btn-danger">Delete</button>
             </td>
         </tr>
-        """
+        """)
     
-    if not servers_html:
-        servers_html = '<tr><td colspan="4" class="text-muted">No tool servers configured yet</td></tr>'
+    servers_html = "".join(rows) or '<tr><td colspan="4" class="text-muted">No tool servers configured yet</td></tr>'
     
-    content = f"""
+    head = """
     <div class="card">
         <div class="card-header">
             <div class="card-title">Tool Servers</div>
@@ -1066,7 +1052,8 @@ async def list_tool_servers():
                 </tr>
             </thead>
             <tbody>
-                {servers_html}
+"""
+    tail = """
             </tbody>
         </table>
     </div>
@@ -1100,34 +1087,31 @@ async def list_tool_servers():
     </div>
     """
     
-    return HTMLResponse(render_template(content, "tool-servers"))
+    return stream_template("tool-servers", head, servers_html, tail)
 
 
 @app.post("/tool-servers/add")
-async def add_tool_server(
+def add_tool_server(
     name: str = Form(...),
     domain: str = Form(...),
     port: int = Form(...),
     description: str = Form(None)
 ):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO tool_servers (name, domain, port, description) VALUES (?, ?, ?, ?)",
-        (name, domain, port, description)
-    )
-    conn.commit()
-    conn.close()
+    with get_db(write=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            INSERT_TOOL_SERVER_SQL,
+            (name, domain, port, description)
+        )
     return RedirectResponse(url="/tool-servers", status_code=303)
 
 
 @app.get("/tool-servers/{server_id}/edit", response_class=HTMLResponse)
-async def edit_tool_server_form(server_id: int):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM tool_servers WHERE id = ?", (server_id,))
-    server = cursor.fetchone()
-    conn.close()
+def edit_tool_server_form(server_id: int):
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SELECT_TOOL_SERVER_SQL, (server_id,))
+        server = cursor.fetchone()
     
     if not server:
         raise HTTPException(status_code=404, detail="Server not found")
@@ -1140,11 +1124,11 @@ async def edit_tool_server_form(server_id: int):
         <form action="/tool-servers/{server_id}/edit" method="post">
             <div class="form-group">
                 <label>Server Name</label>
-                <input type="text" name="name" required value="{server['name']}">
+                <input type="text" name="name" required value="{escape(server['name'])}">
             </div>
             <div class="form-group">
                 <label>Domain</label>
-                <input type="text" name="domain" required value="{server['domain']}">
+                <input type="text" name="domain" required value="{escape(server['domain'])}">
             </div>
             <div class="form-group">
                 <label>Port</label>
@@ -1152,7 +1136,7 @@ async def edit_tool_server_form(server_id: int):
             </div>
             <div class="form-group">
                 <label>Description</label>
-                <textarea name="description">{server['description'] or ''}</textarea>
+                <textarea name="description">{escape(server['description'] or '')}</textarea>
             </div>
             <div class="flex">
                 <button type="submit" class="btn btn-primary">Save Changes</button>
@@ -1166,81 +1150,74 @@ async def edit_tool_server_form(server_id: int):
 
 
 @app.post("/tool-servers/{server_id}/edit")
-async def edit_tool_server(
+def edit_tool_server(
     server_id: int,
     name: str = Form(...),
     domain: str = Form(...),
     port: int = Form(...),
     description: str = Form(None)
 ):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE tool_servers SET name = ?, domain = ?, port = ?, description = ? WHERE id = ?",
-        (name, domain, port, description, server_id)
-    )
-    conn.commit()
-    conn.close()
+    with get_db(write=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            UPDATE_TOOL_SERVER_SQL,
+            (name, domain, port, description, server_id)
+        )
+    invalidate_course_cache()
+    
     return RedirectResponse(url="/tool-servers", status_code=303)
 
 
 @app.get("/tool-servers/{server_id}/delete")
-async def delete_tool_server(server_id: int):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM tool_servers WHERE id = ?", (server_id,))
-    conn.commit()
-    conn.close()
+def delete_tool_server(server_id: int):
+    with get_db(write=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(DELETE_TOOL_SERVER_SQL, (server_id,))
+    invalidate_course_cache()
+    
     return RedirectResponse(url="/tool-servers", status_code=303)
 
 
 # ============== TOOLS ==============
 
 @app.get("/tools", response_class=HTMLResponse)
-async def list_tools():
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT t.*, ts.name as server_name, ts.domain, ts.port
-        FROM tools t
-        JOIN tool_servers ts ON t.tool_server_id = ts.id
-        ORDER BY t.created_at DESC
-    """)
-    tools = cursor.fetchall()
-    
-    cursor.execute("SELECT * FROM tool_servers")
-    servers = cursor.fetchall()
-    conn.close()
-    
-    tools_html = ""
+def list_tools():
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SELECT_TOOLS_SQL)
+        tools = cursor.fetchall()
+    
+        cursor.execute(SELECT_TOOL_SERVER_OPTIONS_SQL)
+        servers = cursor.fetchall()
+    
+    rows = []
     for tool in tools:
         launch_url = f"http://{tool['domain']}:{tool['port']}{tool['launch_path']}"
-        tools_html += f"""
+        rows.append(f"""
         <tr>
-            <td><strong>{tool['name']}</strong></td>
-            <td>{tool['server_name']}</td>
-            <td><code style="font-size: 0.75rem;">{launch_url}</code></td>
-            <td><code>{tool['consumer_key']}</code></td>
+            <td><strong>{escape(tool['name'])}</strong></td>
+            <td>{escape(tool['server_name'])}</td>
+            <td><code style="font-size: 0.75rem;">{escape(launch_url)}</code></td>
+            <td><code>{escape(tool['consumer_key'])}</code></td>
             <td>
                 <a href="/tools/{tool['id']}/edit" class="btn btn-sm btn-secondary">Edit</a>
-                <button onclick="confirmDelete('/tools/{tool['id']}/delete', '{tool['name']}')" 
+                <button onclick="confirmDelete('/tools/{tool['id']}/delete', {escape(json.dumps(tool['name']))})" 
                         class="btn btn-sm btn-danger">Delete</button>
             </td>
         </tr>
-        """
+        """)
     
-    if not tools_html:
-        tools_html = '<tr><td colspan="5" class="text-muted">No tools configured yet</td></tr>'
+    tools_html = "".join(rows) or '<tr><td colspan="5" class="text-muted">No tools configured yet</td></tr>'
     
     server_options = "".join(
-        f'<option value="{s["id"]}">{s["name"]} ({s["domain"]}:{s["port"]})</option>'
+        f'<option value="{s["id"]}">{escape(s["name"])} ({escape(s["domain"])}:{s["port"]})</option>'
         for s in servers
     )
     
     if not servers:
         server_options = '<option disabled>Add a tool server first</option>'
     
-    content = f"""
+    head = """
     <div class="card">
         <div class="card-header">
             <div class="card-title">Tools</div>
@@ -1257,7 +1234,8 @@ async def list_tools():
                 </tr>
             </thead>
             <tbody>
-                {tools_html}
+"""
+    tail = f"""
             </tbody>
         </table>
     </div>
@@ -1313,11 +1291,11 @@ async def list_tools():
     </div>
     """
     
-    return HTMLResponse(render_template(content, "tools"))
+    return stream_template("tools", head, tools_html, tail)
 
 
 @app.post("/tools/add")
-async def add_tool(
+def add_tool(
     name: str = Form(...),
     tool_server_id: int = Form(...),
     launch_path: str = Form(...),
@@ -1327,36 +1305,33 @@ async def add_tool(
     description: str = Form(None),
     launch_url_override: str = Form(None)
 ):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute(
-        """INSERT INTO tools 
-           (tool_server_id, name, launch_path, consumer_key, consumer_secret, custom_params, description, launch_url_override) 
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-        (tool_server_id, name, launch_path, consumer_key, consumer_secret, custom_params, description, launch_url_override or None)
-    )
-    conn.commit()
-    conn.close()
+    with get_db(write=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            INSERT_TOOL_SQL,
+            (tool_server_id, name, launch_path, consumer_key, consumer_secret, custom_params, description, launch_url_override or None)
+        )
+    invalidate_course_cache()
+    
     return RedirectResponse(url="/tools", status_code=303)
 
 
 @app.get("/tools/{tool_id}/edit", response_class=HTMLResponse)
-async def edit_tool_form(tool_id: int):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM tools WHERE id = ?", (tool_id,))
-    tool = cursor.fetchone()
+def edit_tool_form(tool_id: int):
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SELECT_TOOL_SQL, (tool_id,))
+        tool = cursor.fetchone()
     
-    cursor.execute("SELECT * FROM tool_servers")
-    servers = cursor.fetchall()
-    conn.close()
+        cursor.execute(SELECT_TOOL_SERVER_OPTIONS_SQL)
+        servers = cursor.fetchall()
     
     if not tool:
         raise HTTPException(status_code=404, detail="Tool not found")
     
     server_options = "".join(
         f'<option value="{s["id"]}" {"selected" if s["id"] == tool["tool_server_id"] else ""}>'
-        f'{s["name"]} ({s["domain"]}:{s["port"]})</option>'
+        f'{escape(s["name"])} ({escape(s["domain"])}:{s["port"]})</option>'
         for s in servers
     )
     
@@ -1368,7 +1343,7 @@ async def edit_tool_form(tool_id: int):
         <form action="/tools/{tool_id}/edit" method="post">
             <div class="form-group">
                 <label>Tool Name</label>
-                <input type="text" name="name" required value="{tool['name']}">
+                <input type="text" name="name" required value="{escape(tool['name'])}">
             </div>
             <div class="form-group">
                 <label>Tool Server</label>
@@ -1378,30 +1353,30 @@ async def edit_tool_form(tool_id: int):
             </div>
             <div class="form-group">
                 <label>Launch Path</label>
-                <input type="text" name="launch_path" required value="{tool['launch_path']}">
+                <input type="text" name="launch_path" required value="{escape(tool['launch_path'])}">
             </div>
             <div class="form-group">
                 <label>Consumer Key</label>
-                <input type="text" name="consumer_key" required value="{tool['consumer_key']}">
+                <input type="text" name="consumer_key" required value="{escape(tool['consumer_key'])}">
             </div>
             <div class="form-group">
                 <label>Consumer Secret</label>
-                <input type="text" name="consumer_secret" required value="{tool['consumer_secret']}">
+                <input type="text" name="consumer_secret" required value="{escape(tool['consumer_secret'])}">
             </div>
             <div class="form-group">
                 <label>Custom Parameters (JSON, optional)</label>
-                <textarea name="custom_params">{tool['custom_params'] or ''}</textarea>
+                <textarea name="custom_params">{escape(tool['custom_params'] or '')}</textarea>
             </div>
             <div class="form-group">
                 <label>Launch URL Override (optional, for Docker networking)</label>
-                <input type="text" name="launch_url_override" value="{tool['launch_url_override'] or ''}">
+                <input type="text" name="launch_url_override" value="{escape(tool['launch_url_override'] or '')}">
                 <small style="color: var(--text-muted); display: block; margin-top: 0.25rem;">
                     If set, this exact URL will be used for OAuth signing. Use when the tool sees a different URL than the browser.
                 </small>
             </div>
             <div class="form-group">
                 <label>Description</label>
-                <textarea name="description">{tool['description'] or ''}</textarea>
+                <textarea name="description">{escape(tool['description'] or '')}</textarea>
             </div>
             <div class="flex">
                 <button type="submit" class="btn btn-primary">Save Changes</button>
@@ -1415,7 +1390,7 @@ async def edit_tool_form(tool_id: int):
 
 
 @app.post("/tools/{tool_id}/edit")
-async def edit_tool(
+def edit_tool(
     tool_id: int,
     name: str = Form(...),
     tool_server_id: int = Form(...),
@@ -1426,166 +1401,151 @@ async def edit_tool(
     description: str = Form(None),
     launch_url_override: str = Form(None)
 ):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute(
-        """UPDATE tools SET 
-           tool_server_id = ?, name = ?, launch_path = ?, consumer_key = ?, 
-           consumer_secret = ?, custom_params = ?, description = ?, launch_url_override = ?
-           WHERE id = ?""",
-        (tool_server_id, name, launch_path, consumer_key, consumer_secret, custom_params, description, launch_url_override or None, tool_id)
-    )
-    conn.commit()
-    conn.close()
+    with get_db(write=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            UPDATE_TOOL_SQL,
+            (tool_server_id, name, launch_path, consumer_key, consumer_secret, custom_params, description, launch_url_override or None, tool_id)
+        )
+    invalidate_course_cache()
+    
     return RedirectResponse(url="/tools", status_code=303)
 
 
 @app.get("/tools/{tool_id}/delete")
-async def delete_tool(tool_id: int):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM tools WHERE id = ?", (tool_id,))
-    conn.commit()
-    conn.close()
+def delete_tool(tool_id: int):
+    with get_db(write=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(DELETE_TOOL_SQL, (tool_id,))
+    invalidate_course_cache()
+    
     return RedirectResponse(url="/tools", status_code=303)
 
 
 # ============== COURSES ==============
 
 @app.get("/courses", response_class=HTMLResponse)
-async def list_courses():
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM courses ORDER BY created_at DESC")
-    courses = cursor.fetchall()
-    conn.close()
-    
-    courses_html = ""
+def list_courses():
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SELECT_COURSES_SQL)
+        courses = cursor.fetchall()
+    
+    cards = []
     for course in courses:
-        courses_html += f"""
+        cards.append(f"""
         <div class="card">
             <div class="card-header">
                 <div>
-                    <div class="card-title">{course['name']}</div>
-                    <div class="text-muted">{course['code']}</div>
+                    <div class="card-title">{escape(course['name'])}</div>
+                    <div class="text-muted">{escape(course['code'])}</div>
                 </div>
                 <a href="/courses/{course['id']}" class="btn btn-primary">Open Course</a>
             </div>
-            <p style="color: var(--text-secondary);">{course['description'] or 'No description'}</p>
+            <p style="color: var(--text-secondary);">{escape(course['description'] or 'No description')}</p>
         </div>
-        """
+        """)
     
-    if not courses_html:
-        courses_html = '<div class="empty-state"><h3>No courses</h3><p>Demo courses should have been created automatically.</p></div>'
+    courses_html = "".join(cards) or '<div class="empty-state"><h3>No courses</h3><p>Demo courses should have been created automatically.</p></div>'
     
-    content = f"""
+    head = """
     <h2 class="mb-2">Courses</h2>
     <div class="grid grid-3">
-        {courses_html}
+"""
+    tail = """
     </div>
     """
     
-    return HTMLResponse(render_template(content, "courses"))
+    return stream_template("courses", head, courses_html, tail)
 
 
 @app.get("/courses/{course_id}", response_class=HTMLResponse)
-async def view_course(course_id: int):
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM courses WHERE id = ?", (course_id,))
-    course = cursor.fetchone()
-    
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-    
-    # Get enrolled users
-    cursor.execute("""
-        SELECT u.* FROM users u
-        JOIN enrollments e ON u.id = e.user_id
-        WHERE e.course_id = ?
-        ORDER BY u.role, u.name
-    """, (course_id,))
-    users = cursor.fetchall()
-    
-    # Get course tools
-    cursor.execute("""
-        SELECT ct.*, t.name as tool_name, t.launch_path, t.consumer_key,
-               ts.domain, ts.port
-        FROM course_tools ct
-        JOIN tools t ON ct.tool_id = t.id
-        JOIN tool_servers ts ON t.tool_server_id = ts.id
-        WHERE ct.course_id = ?
-    """, (course_id,))
-    course_tools = cursor.fetchall()
-    
-    # Get available tools to add
-    cursor.execute("""
-        SELECT t.*, ts.name as server_name, ts.domain, ts.port
-        FROM tools t
-        JOIN tool_servers ts ON t.tool_server_id = ts.id
-        WHERE t.id NOT IN (SELECT tool_id FROM course_tools WHERE course_id = ?)
-    """, (course_id,))
-    available_tools = cursor.fetchall()
-    
-    conn.close()
+def view_course(course_id: int):
+    with get_db() as conn:
+        cursor = conn.cursor()
+    
+        cursor.execute(SELECT_COURSE_SQL, (course_id,))
+        course = cursor.fetchone()
+    
+        if not course:
+            raise HTTPException(status_code=404, detail="Course not found")
+    
+        cached = _cached_course_rows(course_id)
+        if cached:
+            users, tool_rows = cached
+        else:
+            # Get enrolled users
+            cursor.execute(SELECT_COURSE_USERS_SQL, (course_id,))
+            users = cursor.fetchall()
+    
+            # Every tool once: attached ones carry their course_tools row, the rest
+            # are still available to add (no NOT IN subquery)
+            cursor.execute(SELECT_COURSE_TOOLS_SQL, (course_id,))
+            tool_rows = cursor.fetchall()
+            _cache_course_rows(course_id, users, tool_rows)
+    
+    course_tools = [t for t in tool_rows if t['attached']]
+    available_tools = [t for t in tool_rows if not t['attached']]
     
     # Build users section
-    teachers = [u for u in users if u['role'] == 'teacher']
-    students = [u for u in users if u['role'] == 'student']
+    # One pass; the users.role CHECK constraint allows only these two roles
+    teachers, students = [], []
+    add_by_role = {'teacher': teachers.append, 'student': students.append}
+    for u in users:
+        add_by_role[u['role']](u)
     
-    users_html = "<h4>Teachers</h4><div class='user-selector'>"
+    parts = ["<h4>Teachers</h4><div class='user-selector'>"]
     for u in teachers:
-        users_html += f"""
+        parts.append(f"""
         <div class="user-card" onclick="selectUser({u['id']}, this)">
-            <div class="name">{u['name']}</div>
+            <div class="name">{escape(u['name'])}</div>
             <div class="role">👨‍🏫 Teacher</div>
         </div>
-        """
-    users_html += "</div><h4>Students</h4><div class='user-selector'>"
+        """)
+    parts.append("</div><h4>Students</h4><div class='user-selector'>")
     for u in students:
-        users_html += f"""
+        parts.append(f"""
         <div class="user-card" onclick="selectUser({u['id']}, this)">
-            <div class="name">{u['name']}</div>
+            <div class="name">{escape(u['name'])}</div>
             <div class="role">👨‍🎓 Student</div>
         </div>
-        """
-    users_html += "</div>"
+        """)
+    parts.append("</div>")
+    users_html = "".join(parts)
     
     # Build tools section
-    tools_html = ""
+    rows = []
     for ct in course_tools:
         launch_url = f"http://{ct['domain']}:{ct['port']}{ct['launch_path']}"
-        tools_html += f"""
+        rows.append(f"""
         <tr>
-            <td><strong>{ct['tool_name']}</strong></td>
-            <td><code style="font-size: 0.75rem;">{ct['resource_link_id'][:20]}...</code></td>
+            <td><strong>{escape(ct['tool_name'])}</strong></td>
+            <td><code style="font-size: 0.75rem;">{escape(ct['resource_link_id'][:20])}...</code></td>
             <td>
                 <button onclick="launchTool({ct['id']}, 'iframe')" class="btn btn-sm btn-success">Launch (iframe)</button>
                 <button onclick="launchTool({ct['id']}, 'window')" class="btn btn-sm btn-primary">Launch (new tab)</button>
-                <button onclick="confirmDelete('/courses/{course_id}/tools/{ct['id']}/remove', '{ct['tool_name']}')" 
+                <button onclick="confirmDelete('/courses/{course_id}/tools/{ct['id']}/remove', {escape(json.dumps(ct['tool_name']))})" 
                         class="btn btn-sm btn-danger">Remove</button>
             </td>
         </tr>
-        """
+        """)
     
-    if not tools_html:
-        tools_html = '<tr><td colspan="3" class="text-muted">No tools added to this course yet</td></tr>'
+    tools_html = "".join(rows) or '<tr><td colspan="3" class="text-muted">No tools added to this course yet</td></tr>'
     
     # Available tools dropdown
     tool_options = "".join(
-        f'<option value="{t["id"]}">{t["name"]} ({t["server_name"]})</option>'
+        f'<option value="{t["id"]}">{escape(t["tool_name"])} ({escape(t["server_name"])})</option>'
         for t in available_tools
     )
     
     if not available_tools:
         tool_options = '<option disabled>No more tools available</option>'
     
-    content = f"""
+    head = f"""
     <div class="flex flex-between mb-2">
         <div>
-            <h2>{course['name']}</h2>
-            <p class="text-muted">{course['code']} • {course['description'] or 'No description'}</p>
+            <h2>{escape(course['name'])}</h2>
+            <p class="text-muted">{escape(course['code'])} • {escape(course['description'] or 'No description')}</p>
         </div>
         <a href="/courses" class="btn btn-secondary">← Back to Courses</a>
     </div>
@@ -1596,7 +1556,8 @@ async def view_course(course_id: int):
                 <div class="card-title">Select User to Launch As</div>
             </div>
             <input type="hidden" id="selected_user_id" value="">
-            {users_html}
+"""
+    middle = f"""
         </div>
         
         <div class="card">
@@ -1628,7 +1589,8 @@ async def view_course(course_id: int):
                 </tr>
             </thead>
             <tbody>
-                {tools_html}
+"""
+    tail = """
             </tbody>
         </table>
     </div>
@@ -1642,87 +1604,79 @@ async def view_course(course_id: int):
     </div>
     
     <script>
-        function launchTool(courseToolId, mode) {{
+        function launchTool(courseToolId, mode) {
             const userId = document.getElementById('selected_user_id').value;
-            if (!userId) {{
+            if (!userId) {
                 alert('Please select a user first');
                 return;
-            }}
+            }
             
-            const launchUrl = `/launch/${{courseToolId}}?user_id=${{userId}}`;
+            const launchUrl = `/launch/${courseToolId}?user_id=${userId}`;
             
-            if (mode === 'iframe') {{
+            if (mode === 'iframe') {
                 document.getElementById('launchFrame').style.display = 'block';
                 document.getElementById('toolIframe').src = launchUrl;
-            }} else {{
+            } else {
                 window.open(launchUrl, '_blank');
-            }}
-        }}
+            }
+        }
     </script>
     """
     
-    return HTMLResponse(render_template(content, "courses"))
+    return stream_template("courses", head, users_html, middle, tools_html, tail)
 
 
 @app.post("/courses/{course_id}/tools/add")
-async def add_tool_to_course(course_id: int, tool_id: int = Form(...)):
-    conn = get_db()
-    cursor = conn.cursor()
-    
+def add_tool_to_course(course_id: int, tool_id: int = Form(...)):
     # Generate unique resource link id
-    resource_link_id = str(uuid.uuid4())
+    resource_link_id = uuid.uuid4().hex
     
-    # Get tool name for title
-    cursor.execute("SELECT name FROM tools WHERE id = ?", (tool_id,))
-    tool = cursor.fetchone()
-    resource_link_title = tool['name'] if tool else "LTI Activity"
+    with get_db(write=True) as conn:
+        conn.execute(INSERT_COURSE_TOOL_SQL, (course_id, resource_link_id, tool_id))
     
-    cursor.execute(
-        """INSERT INTO course_tools (course_id, tool_id, resource_link_id, resource_link_title)
-           VALUES (?, ?, ?, ?)""",
-        (course_id, tool_id, resource_link_id, resource_link_title)
-    )
-    conn.commit()
-    conn.close()
+    invalidate_course_cache(course_id)
     
     return RedirectResponse(url=f"/courses/{course_id}", status_code=303)
 
 
 @app.get("/courses/{course_id}/tools/{course_tool_id}/remove")
-async def remove_tool_from_course(course_id: int, course_tool_id: int):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM course_tools WHERE id = ? AND course_id = ?", (course_tool_id, course_id))
-    conn.commit()
-    conn.close()
+def remove_tool_from_course(course_id: int, course_tool_id: int):
+    with get_db(write=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute(DELETE_COURSE_TOOL_SQL, (course_tool_id, course_id))
+    invalidate_course_cache(course_id)
+    
     return RedirectResponse(url=f"/courses/{course_id}", status_code=303)
 
 
 # ============== LAUNCH ==============
 
+def _log_launch(course_tool_id: int, user_id: int, params: dict):
+    """Record a launch. Params are stored compact and pretty-printed when viewed."""
+    params_without_sig = {k: v for k, v in params.items() if k != 'oauth_signature'}
+    with get_db(write=True) as conn:
+        conn.execute(
+            INSERT_LAUNCH_LOG_SQL,
+            (course_tool_id, user_id, json.dumps(params_without_sig, separators=(",", ":")),
+             json.dumps(params, separators=(",", ":")), params['oauth_signature'])
+        )
+
+
 @app.get("/launch/{course_tool_id}", response_class=HTMLResponse)
-async def launch_tool(request: Request, course_tool_id: int, user_id: int):
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    # Get course tool details
-    cursor.execute("""
-        SELECT ct.*, t.*, ts.domain, ts.port,
-               c.id as course_id, c.name as course_name, c.code as course_code
-        FROM course_tools ct
-        JOIN tools t ON ct.tool_id = t.id
-        JOIN tool_servers ts ON t.tool_server_id = ts.id
-        JOIN courses c ON ct.course_id = c.id
-        WHERE ct.id = ?
-    """, (course_tool_id,))
-    ct = cursor.fetchone()
-    
-    if not ct:
-        raise HTTPException(status_code=404, detail="Course tool not found")
-    
-    # Get user
-    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-    user = cursor.fetchone()
+def launch_tool(request: Request, background_tasks: BackgroundTasks, course_tool_id: int, user_id: int):
+    with get_db() as conn:
+        cursor = conn.cursor()
+        
+        # Get course tool details
+        cursor.execute(SELECT_LAUNCH_COURSE_TOOL_SQL, (course_tool_id,))
+        ct = cursor.fetchone()
+        
+        if not ct:
+            raise HTTPException(status_code=404, detail="Course tool not found")
+        
+        # Get user
+        cursor.execute(SELECT_LAUNCH_USER_SQL, (user_id,))
+        user = cursor.fetchone()
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1730,10 +1684,10 @@ async def launch_tool(request: Request, course_tool_id: int, user_id: int):
     # Build launch URL - use override if specified, otherwise construct from server
     if ct['launch_url_override']:
         launch_url = ct['launch_url_override']
-        print(f"DEBUG: Using launch_url_override: {launch_url}")
+        logger.debug("Using launch_url_override: %s", launch_url)
     else:
         launch_url = f"http://{ct['domain']}:{ct['port']}{ct['launch_path']}"
-        print(f"DEBUG: Constructed launch_url: {launch_url}")
+        logger.debug("Constructed launch_url: %s", launch_url)
     
     # Get the platform's base URL for outcomes
     base_url = str(request.base_url).rstrip('/')
@@ -1747,19 +1701,12 @@ async def launch_tool(request: Request, course_tool_id: int, user_id: int):
         except:
             pass
     
-    # Build LTI params
-    tool_dict = dict(ct)
-    course_dict = {
-        'id': ct['course_id'],
-        'name': ct['course_name'],
-        'code': ct['course_code']
-    }
-    user_dict = dict(user)
-    
+    # Build LTI params; the rows are passed as-is, only the course columns
+    # need renaming
     params = build_lti_launch_params(
-        tool=tool_dict,
-        course=course_dict,
-        user=user_dict,
+        tool=ct,
+        course={'id': ct['course_id'], 'name': ct['course_name'], 'code': ct['course_code']},
+        user=user,
         resource_link_id=ct['resource_link_id'],
         resource_link_title=ct['resource_link_title'] or ct['name'],
         launch_url=launch_url,
@@ -1767,63 +1714,30 @@ async def launch_tool(request: Request, course_tool_id: int, user_id: int):
         custom_params=custom_params
     )
     
-    # Log the launch
-    params_without_sig = {k: v for k, v in params.items() if k != 'oauth_signature'}
-    cursor.execute(
-        """INSERT INTO launch_logs 
-           (course_tool_id, user_id, launch_params, signed_params, oauth_signature)
-           VALUES (?, ?, ?, ?, ?)""",
-        (course_tool_id, user_id, json.dumps(params_without_sig, indent=2), 
-         json.dumps(params, indent=2), params['oauth_signature'])
-    )
-    conn.commit()
-    conn.close()
+    # Log the launch after the response is sent; it is not needed to launch
+    background_tasks.add_task(_log_launch, course_tool_id, user_id, params)
     
     # Generate auto-submit form
-    form_fields = "".join(
-        f'<input type="hidden" name="{k}" value="{v}">'
+    # Escaped so quotes or markup in a value (course names, custom params)
+    # cannot break the form and change what the tool receives
+    form_fields = "".join([
+        f'<input type="hidden" name="{escape(k)}" value="{escape(str(v))}">'
         for k, v in params.items()
-    )
+    ])
     
     html = f"""
     <!DOCTYPE html>
     <html>
     <head>
         <title>Launching LTI Tool...</title>
-        <style>
-            body {{
-                font-family: 'Space Grotesk', sans-serif;
-                background: #0a0a0f;
-                color: #f8fafc;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                min-height: 100vh;
-                margin: 0;
-            }}
-            .loader {{
-                text-align: center;
-            }}
-            .spinner {{
-                width: 40px;
-                height: 40px;
-                border: 3px solid #2d2d3a;
-                border-top-color: #6366f1;
-                border-radius: 50%;
-                animation: spin 1s linear infinite;
-                margin: 0 auto 1rem;
-            }}
-            @keyframes spin {{
-                to {{ transform: rotate(360deg); }}
-            }}
-        </style>
+        <link rel="stylesheet" href="/static/launch.css?v={ASSET_VERSION}">
     </head>
     <body>
         <div class="loader">
             <div class="spinner"></div>
             <p>Launching LTI Tool...</p>
         </div>
-        <form id="ltiForm" action="{launch_url}" method="POST" style="display:none;">
+        <form id="ltiForm" action="{escape(launch_url)}" method="POST" style="display:none;">
             {form_fields}
         </form>
         <script>
@@ -1838,46 +1752,78 @@ async def launch_tool(request: Request, course_tool_id: int, user_id: int):
 
 # ============== LAUNCH LOGS ==============
 
-@app.get("/launch-logs", response_class=HTMLResponse)
-async def list_launch_logs():
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT ll.*, u.name as user_name, u.role as user_role,
-               t.name as tool_name, c.name as course_name
-        FROM launch_logs ll
-        JOIN users u ON ll.user_id = u.id
-        JOIN course_tools ct ON ll.course_tool_id = ct.id
-        JOIN tools t ON ct.tool_id = t.id
-        JOIN courses c ON ct.course_id = c.id
-        ORDER BY ll.launched_at DESC
-        LIMIT 100
-    """)
-    logs = cursor.fetchall()
-    conn.close()
-    
-    logs_html = ""
-    for log in logs:
-        role_badge = "badge-teacher" if log['user_role'] == 'teacher' else "badge-student"
-        logs_html += f"""
+# Rows per page on the launch-log and grade lists
+LIST_PAGE_SIZE = 100
+
+
+def fetch_page(conn, first_sql: str, before_sql: str, before: Optional[int]):
+    """Fetch one newest-first page; also returns the id to continue from, if any"""
+    if before is None:
+        cursor = conn.execute(first_sql, (LIST_PAGE_SIZE + 1,))
+    else:
+        cursor = conn.execute(before_sql, (before, LIST_PAGE_SIZE + 1))
+    if JSON_ORDERED_PAGES:
+        rows = json.loads(cursor.fetchone()[0])
+    else:
+        rows = cursor.fetchall()
+    if len(rows) > LIST_PAGE_SIZE:
+        rows = rows[:LIST_PAGE_SIZE]
+        return rows, rows[-1]['id']
+    return rows, None
+
+
+def list_etag(conn, version_sql: str, before: Optional[int]) -> str:
+    """Weak ETag for a list page: its table's newest row, the page and the tool names.
+
+    Weak because GZipMiddleware sends the same page as different bytes
+    depending on Accept-Encoding.
+    """
+    max_id, max_ts, generation = conn.execute(version_sql).fetchone()
+    key = f"{max_id}:{max_ts}:{before}:{generation}:{ASSET_VERSION}"
+    return 'W/"' + hashlib.md5(key.encode(), usedforsecurity=False).hexdigest() + '"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 response if the client already has this version of the page"""
+    if_none_match = request.headers.get("if-none-match")
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    opaque_tag = etag.removeprefix("W/")
+    if if_none_match and opaque_tag in [
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    ]:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+# List pages are revalidated on every visit; unchanged ones come back as 304
+LIST_CACHE_CONTROL = "no-cache"
+
+
+def older_link(path: str, next_before: Optional[int]) -> str:
+    """Link to the next (older) page of a list, or nothing on the last page"""
+    if next_before is None:
+        return ""
+    return f'<div class="mt-2"><a href="{path}?before={next_before}" class="btn btn-sm btn-secondary">Older &rarr;</a></div>'
+
+# One row of the launch log table
+_LAUNCH_LOG_ROW = """
         <tr>
-            <td>{log['launched_at']}</td>
-            <td>{log['course_name']}</td>
-            <td>{log['tool_name']}</td>
+            <td>{launched_at}</td>
+            <td>{course_name}</td>
+            <td>{tool_name}</td>
             <td>
-                {log['user_name']}
-                <span class="badge {role_badge}">{log['user_role']}</span>
+                {user_name}
+                <span class="badge {role_badge}">{user_role}</span>
             </td>
             <td>
-                <a href="/launch-logs/{log['id']}" class="btn btn-sm btn-secondary">Inspect</a>
+                <a href="/launch-logs/{id}" class="btn btn-sm btn-secondary">Inspect</a>
             </td>
         </tr>
-        """
-    
-    if not logs_html:
-        logs_html = '<tr><td colspan="5" class="text-muted">No launches recorded yet</td></tr>'
-    
-    content = f"""
+        """.format
+
+
+# Static parts of the launch-log and grade lists, around the rows
+_LAUNCH_LOGS_HEAD = """
     <div class="card">
         <div class="card-header">
             <div class="card-title">Launch Logs</div>
@@ -1893,40 +1839,59 @@ async def list_launch_logs():
                 </tr>
             </thead>
             <tbody>
-                {logs_html}
+"""
+_LIST_TABLE_TAIL = """
             </tbody>
         </table>
+"""
+_LIST_CARD_TAIL = """
     </div>
-    """
+"""
+
+
+@app.get("/launch-logs", response_class=HTMLResponse)
+def list_launch_logs(request: Request, before: Optional[int] = None):
+    with get_db() as conn:
+        etag = list_etag(conn, SELECT_LAUNCH_LOGS_VERSION_SQL, before)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        logs, next_before = fetch_page(
+            conn, SELECT_LAUNCH_LOGS_SQL, SELECT_LAUNCH_LOGS_BEFORE_SQL, before
+        )
     
-    return HTMLResponse(render_template(content, "launch-logs"))
+    logs_html = "".join([
+        _LAUNCH_LOG_ROW(
+            id=log['id'],
+            launched_at=log['launched_at'],
+            course_name=escape(log['course_name']),
+            tool_name=escape(log['tool_name']),
+            user_name=escape(log['user_name']),
+            user_role=escape(log['user_role']),
+            role_badge=_ROLE_BADGES.get(log['user_role'], 'badge-student'),
+        )
+        for log in logs
+    ]) or '<tr><td colspan="5" class="text-muted">No launches recorded yet</td></tr>'
+    
+    return stream_template(
+        "launch-logs", _LAUNCH_LOGS_HEAD, logs_html, _LIST_TABLE_TAIL,
+        older_link("/launch-logs", next_before), _LIST_CARD_TAIL,
+        headers={"ETag": etag, "Cache-Control": LIST_CACHE_CONTROL},
+    )
 
 
 @app.get("/launch-logs/{log_id}", response_class=HTMLResponse)
-async def view_launch_log(log_id: int):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT ll.*, u.name as user_name, u.role as user_role, u.email as user_email,
-               t.name as tool_name, t.launch_path, t.consumer_key, t.consumer_secret,
-               ts.domain, ts.port,
-               c.name as course_name, c.code as course_code
-        FROM launch_logs ll
-        JOIN users u ON ll.user_id = u.id
-        JOIN course_tools ct ON ll.course_tool_id = ct.id
-        JOIN tools t ON ct.tool_id = t.id
-        JOIN tool_servers ts ON t.tool_server_id = ts.id
-        JOIN courses c ON ct.course_id = c.id
-        WHERE ll.id = ?
-    """, (log_id,))
-    log = cursor.fetchone()
-    conn.close()
+def view_launch_log(log_id: int):
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SELECT_LAUNCH_LOG_SQL, (log_id,))
+        log = cursor.fetchone()
     
     if not log:
         raise HTTPException(status_code=404, detail="Launch log not found")
     
     launch_url = f"http://{log['domain']}:{log['port']}{log['launch_path']}"
-    role_badge = "badge-teacher" if log['user_role'] == 'teacher' else "badge-student"
+    role_badge = _ROLE_BADGES.get(log['user_role'], 'badge-student')
     
     content = f"""
     <div class="flex flex-between mb-2">
@@ -1941,22 +1906,22 @@ async def view_launch_log(log_id: int):
         <div class="card">
             <div class="card-title mb-2">Launch Details</div>
             <table>
-                <tr><td class="text-muted">Course</td><td>{log['course_name']} ({log['course_code']})</td></tr>
-                <tr><td class="text-muted">Tool</td><td>{log['tool_name']}</td></tr>
-                <tr><td class="text-muted">Launch URL</td><td><code>{launch_url}</code></td></tr>
+                <tr><td class="text-muted">Course</td><td>{escape(log['course_name'])} ({escape(log['course_code'])})</td></tr>
+                <tr><td class="text-muted">Tool</td><td>{escape(log['tool_name'])}</td></tr>
+                <tr><td class="text-muted">Launch URL</td><td><code>{escape(launch_url)}</code></td></tr>
                 <tr>
                     <td class="text-muted">User</td>
-                    <td>{log['user_name']} <span class="badge {role_badge}">{log['user_role']}</span></td>
+                    <td>{escape(log['user_name'])} <span class="badge {role_badge}">{escape(log['user_role'])}</span></td>
                 </tr>
-                <tr><td class="text-muted">Email</td><td>{log['user_email']}</td></tr>
+                <tr><td class="text-muted">Email</td><td>{escape(log['user_email'])}</td></tr>
             </table>
         </div>
         
         <div class="card">
             <div class="card-title mb-2">OAuth Details</div>
             <table>
-                <tr><td class="text-muted">Consumer Key</td><td><code>{log['consumer_key']}</code></td></tr>
-                <tr><td class="text-muted">Consumer Secret</td><td><code>{log['consumer_secret']}</code></td></tr>
+                <tr><td class="text-muted">Consumer Key</td><td><code>{escape(log['consumer_key'])}</code></td></tr>
+                <tr><td class="text-muted">Consumer Secret</td><td><code>{escape(log['consumer_secret'])}</code></td></tr>
                 <tr><td class="text-muted">Signature</td><td><code style="word-break: break-all;">{log['oauth_signature']}</code></td></tr>
             </table>
         </div>
@@ -1969,10 +1934,10 @@ async def view_launch_log(log_id: int):
             <button class="tab" data-tab="signed" onclick="showTab('signed')">Signed Params</button>
         </div>
         <div id="unsigned" class="tab-content active">
-            <div class="code-block"><pre>{log['launch_params']}</pre></div>
+            <div class="code-block"><pre>{escape(json.dumps(json.loads(log['launch_params']), indent=2), quote=False)}</pre></div>
         </div>
         <div id="signed" class="tab-content">
-            <div class="code-block"><pre>{log['signed_params']}</pre></div>
+            <div class="code-block"><pre>{escape(json.dumps(json.loads(log['signed_params']), indent=2), quote=False)}</pre></div>
         </div>
     </div>
     """
@@ -1982,69 +1947,23 @@ async def view_launch_log(log_id: int):
 
 # ============== OUTCOMES (GRADES) ==============
 
-@app.post("/outcomes")
-async def receive_outcome(request: Request):
-    """LTI Basic Outcomes Service endpoint for receiving grades."""
-    body = await request.body()
-    body_text = body.decode('utf-8')
-    
-    # Parse the XML (simple extraction)
-    import re
-    
-    # Extract sourcedId
-    sourced_id_match = re.search(r'<sourcedId>([^<]+)</sourcedId>', body_text)
-    sourced_id = sourced_id_match.group(1) if sourced_id_match else None
-    
-    # Extract score
-    score_match = re.search(r'<textString>([^<]+)</textString>', body_text)
-    score = float(score_match.group(1)) if score_match else None
-    
-    # Extract message identifier
-    msg_id_match = re.search(r'<imsx_messageIdentifier>([^<]+)</imsx_messageIdentifier>', body_text)
-    msg_id = msg_id_match.group(1) if msg_id_match else str(uuid.uuid4())
-    
-    if sourced_id and score is not None:
-        # Decode sourced_id to get course_id, resource_link_id, user_id
-        try:
-            decoded = base64.b64decode(sourced_id).decode()
-            parts = decoded.split(':')
-            if len(parts) == 3:
-                course_id, resource_link_id, user_id = parts
-                
-                conn = get_db()
-                cursor = conn.cursor()
-                
-                # Find the course_tool
-                cursor.execute("""
-                    SELECT id FROM course_tools 
-                    WHERE course_id = ? AND resource_link_id = ?
-                """, (course_id, resource_link_id))
-                ct = cursor.fetchone()
-                
-                if ct:
-                    cursor.execute(
-                        """INSERT INTO grade_results 
-                           (course_tool_id, user_id, sourced_id, score, raw_xml)
-                           VALUES (?, ?, ?, ?, ?)""",
-                        (ct['id'], user_id, sourced_id, score, body_text)
-                    )
-                    conn.commit()
-                conn.close()
-        except:
-            pass
-    
-    # Return success response
-    response_xml = f"""<?xml version="1.0" encoding="UTF-8"?>
+# Fields read from a replaceResult request, by local tag name (the POX
+# envelope is namespaced)
+_OUTCOME_FIELDS = frozenset(("sourcedId", "textString", "imsx_messageIdentifier"))
+
+# Acknowledgement sent for every outcome request; {mid} is the request's
+# message identifier
+_POX_SUCCESS_RESPONSE = """<?xml version="1.0" encoding="UTF-8"?>
 <imsx_POXEnvelopeResponse xmlns="http://www.imsglobal.org/services/ltiv1p1/xsd/imsoms_v1p0">
   <imsx_POXHeader>
     <imsx_POXResponseHeaderInfo>
       <imsx_version>V1.0</imsx_version>
-      <imsx_messageIdentifier>{msg_id}</imsx_messageIdentifier>
+      <imsx_messageIdentifier>{mid}</imsx_messageIdentifier>
       <imsx_statusInfo>
         <imsx_codeMajor>success</imsx_codeMajor>
         <imsx_severity>status</imsx_severity>
         <imsx_description>Score received</imsx_description>
-        <imsx_messageRefIdentifier>{msg_id}</imsx_messageRefIdentifier>
+        <imsx_messageRefIdentifier>{mid}</imsx_messageRefIdentifier>
         <imsx_operationRefIdentifier>replaceResult</imsx_operationRefIdentifier>
       </imsx_statusInfo>
     </imsx_POXResponseHeaderInfo>
@@ -2052,53 +1971,178 @@ async def receive_outcome(request: Request):
   <imsx_POXBody>
     <replaceResultResponse/>
   </imsx_POXBody>
-</imsx_POXEnvelopeResponse>"""
+</imsx_POXEnvelopeResponse>""".format
+
+
+def _parse_outcome_request(body: bytes) -> dict:
+    """Return the first non-empty stripped text of each outcome field, stopping once all are found."""
+    found = {}
+    try:
+        for _, elem in ET.iterparse(io.BytesIO(body.lstrip()), events=("end",)):
+            name = elem.tag.rpartition('}')[2]
+            text = elem.text.strip() if elem.text else ""
+            if name in _OUTCOME_FIELDS and name not in found and text:
+                found[name] = text
+                if len(found) == len(_OUTCOME_FIELDS):
+                    break
+    except ET.ParseError:
+        # Keep whatever was found before the malformed part
+        pass
+    return found
+
+
+def pretty_xml(raw_xml: str) -> str:
+    """Indented copy of an outcome request for the grade page, or the body as-is if it isn't XML."""
+    try:
+        return xml.dom.minidom.parseString(raw_xml).toprettyxml(indent="  ")
+    except Exception:
+        return raw_xml
+
+
+def _store_grades(rows: list):
+    """Record a batch of grades in one transaction.
+
+    Each row is (course_id, resource_link_id, user_id, sourced_id, score,
+    raw_xml); rows whose course tool or user no longer exists are dropped.
+    """
+    # Pretty-print before taking the write lock so it's held only for the inserts
+    params = [
+        (user_id, sourced_id, score, raw_xml, pretty_xml(raw_xml),
+         course_id, resource_link_id, user_id)
+        for course_id, resource_link_id, user_id, sourced_id, score, raw_xml in rows
+    ]
+    with get_db(write=True) as conn:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.executemany(INSERT_GRADE_RESULT_SQL, params)
+        conn.commit()
     
-    return HTMLResponse(content=response_xml, media_type="application/xml")
+    if cursor.rowcount < len(rows):
+        logger.debug("Dropped %d grade(s) for unknown course tools or users", len(rows) - cursor.rowcount)
 
 
-@app.get("/grades", response_class=HTMLResponse)
-async def list_grades():
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT gr.*, u.name as user_name, u.role as user_role,
-               t.name as tool_name, c.name as course_name
-        FROM grade_results gr
-        JOIN users u ON gr.user_id = u.id
-        JOIN course_tools ct ON gr.course_tool_id = ct.id
-        JOIN tools t ON ct.tool_id = t.id
-        JOIN courses c ON ct.course_id = c.id
-        ORDER BY gr.received_at DESC
-        LIMIT 100
-    """)
-    grades = cursor.fetchall()
-    conn.close()
-    
-    grades_html = ""
-    for grade in grades:
-        role_badge = "badge-teacher" if grade['user_role'] == 'teacher' else "badge-student"
-        score_pct = int(grade['score'] * 100) if grade['score'] else 0
-        grades_html += f"""
+# A burst of outcome POSTs is coalesced into one transaction of at most
+# GRADE_BATCH_SIZE rows, collected for up to GRADE_FLUSH_INTERVAL seconds
+GRADE_BATCH_SIZE = 128
+GRADE_FLUSH_INTERVAL = 0.05
+
+_grade_queue: Optional[asyncio.Queue] = None
+_grade_writer: Optional[asyncio.Task] = None
+# Grades submitted but not yet committed, whether queued, waiting for their
+# batch window or being written; a grade skips the queue only when this is 0,
+# so a later replaceResult is never stored before an earlier one
+_grade_pending = 0
+# Serializes the direct writes with the writer task's batches
+_grade_write_lock: Optional[asyncio.Lock] = None
+
+
+async def _write_grades(rows: list):
+    global _grade_pending
+    try:
+        async with _grade_write_lock:
+            await run_in_threadpool(_store_grades, rows)
+    except Exception:
+        logger.exception("Failed to store %d grade result(s)", len(rows))
+    finally:
+        _grade_pending -= len(rows)
+
+
+async def _grade_writer_loop():
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        row = await _grade_queue.get()
+        if row is None:
+            break
+        rows = [row]
+        deadline = loop.time() + GRADE_FLUSH_INTERVAL
+        while len(rows) < GRADE_BATCH_SIZE:
+            try:
+                row = await asyncio.wait_for(_grade_queue.get(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                break
+            if row is None:
+                stopping = True
+                break
+            rows.append(row)
+        await _write_grades(rows)
+
+
+def start_grade_writer():
+    global _grade_queue, _grade_writer, _grade_write_lock, _grade_pending
+    _grade_queue = asyncio.Queue()
+    _grade_write_lock = asyncio.Lock()
+    _grade_pending = 0
+    _grade_writer = asyncio.create_task(_grade_writer_loop())
+
+
+async def stop_grade_writer():
+    """Flush whatever is still queued and stop the writer task"""
+    await _grade_queue.put(None)
+    await _grade_writer
+
+
+async def submit_grade(row: tuple):
+    """Store one grade, directly when no other grade is pending, else batched"""
+    global _grade_pending
+    _grade_pending += 1
+    if _grade_pending == 1:
+        await _write_grades([row])
+    else:
+        await _grade_queue.put(row)
+
+
+@app.post("/outcomes")
+async def receive_outcome(request: Request):
+    """LTI Basic Outcomes Service endpoint for receiving grades."""
+    body = await request.body()
+    body_text = body.decode('utf-8')
+    
+    # Parse the XML in one pass
+    fields = _parse_outcome_request(body)
+    sourced_id = fields.get('sourcedId')
+    score = float(fields['textString']) if 'textString' in fields else None
+    msg_id = fields.get('imsx_messageIdentifier') or str(uuid.uuid4())
+    
+    if sourced_id and score is not None:
+        # Decode sourced_id to get course_id, resource_link_id, user_id
+        try:
+            parts = base64.b64decode(sourced_id, validate=True).split(b':')
+            if len(parts) == 3:
+                course_id, resource_link_id, user_id = (part.decode() for part in parts)
+                
+                await submit_grade(
+                    (course_id, resource_link_id, user_id, sourced_id, score, body_text)
+                )
+        except (binascii.Error, ValueError):
+            # Not one of our sourcedIds; acknowledge it anyway
+            pass
+    
+    return Response(
+        content=_POX_SUCCESS_RESPONSE(mid=escape(msg_id, quote=False)),
+        media_type="application/xml",
+    )
+
+
+# One row of the received grades table
+_GRADE_ROW = """
         <tr>
-            <td>{grade['received_at']}</td>
-            <td>{grade['course_name']}</td>
-            <td>{grade['tool_name']}</td>
+            <td>{received_at}</td>
+            <td>{course_name}</td>
+            <td>{tool_name}</td>
             <td>
-                {grade['user_name']}
-                <span class="badge {role_badge}">{grade['user_role']}</span>
+                {user_name}
+                <span class="badge {role_badge}">{user_role}</span>
             </td>
             <td><span class="score text-success">{score_pct}%</span></td>
             <td>
-                <a href="/grades/{grade['id']}" class="btn btn-sm btn-secondary">View XML</a>
+                <a href="/grades/{id}" class="btn btn-sm btn-secondary">View XML</a>
             </td>
         </tr>
-        """
-    
-    if not grades_html:
-        grades_html = '<tr><td colspan="6" class="text-muted">No grades received yet</td></tr>'
-    
-    content = f"""
+        """.format
+
+
+_GRADES_HEAD = """
     <div class="card">
         <div class="card-header">
             <div class="card-title">Received Grades</div>
@@ -2115,9 +2159,8 @@ async def list_grades():
                 </tr>
             </thead>
             <tbody>
-                {grades_html}
-            </tbody>
-        </table>
+"""
+_GRADES_TAIL = """
     </div>
     
     <div class="card">
@@ -2127,40 +2170,56 @@ async def list_grades():
             POST /outcomes
         </code>
     </div>
-    """
+"""
+
+
+@app.get("/grades", response_class=HTMLResponse)
+def list_grades(request: Request, before: Optional[int] = None):
+    with get_db() as conn:
+        etag = list_etag(conn, SELECT_GRADE_RESULTS_VERSION_SQL, before)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        grades, next_before = fetch_page(
+            conn, SELECT_GRADE_RESULTS_SQL, SELECT_GRADE_RESULTS_BEFORE_SQL, before
+        )
     
-    return HTMLResponse(render_template(content, "grades"))
+    grades_html = "".join([
+        _GRADE_ROW(
+            id=grade['id'],
+            received_at=grade['received_at'],
+            course_name=escape(grade['course_name']),
+            tool_name=escape(grade['tool_name']),
+            user_name=escape(grade['user_name']),
+            user_role=escape(grade['user_role']),
+            role_badge=_ROLE_BADGES.get(grade['user_role'], 'badge-student'),
+            score_pct=int(grade['score'] * 100) if grade['score'] else 0,
+        )
+        for grade in grades
+    ]) or '<tr><td colspan="6" class="text-muted">No grades received yet</td></tr>'
+    
+    return stream_template(
+        "grades", _GRADES_HEAD, grades_html, _LIST_TABLE_TAIL,
+        older_link("/grades", next_before), _GRADES_TAIL,
+        headers={"ETag": etag, "Cache-Control": LIST_CACHE_CONTROL},
+    )
 
 
 @app.get("/grades/{grade_id}", response_class=HTMLResponse)
-async def view_grade(grade_id: int):
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT gr.*, u.name as user_name, u.role as user_role,
-               t.name as tool_name, c.name as course_name
-        FROM grade_results gr
-        JOIN users u ON gr.user_id = u.id
-        JOIN course_tools ct ON gr.course_tool_id = ct.id
-        JOIN tools t ON ct.tool_id = t.id
-        JOIN courses c ON ct.course_id = c.id
-        WHERE gr.id = ?
-    """, (grade_id,))
-    grade = cursor.fetchone()
-    conn.close()
+def view_grade(grade_id: int):
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SELECT_GRADE_RESULT_SQL, (grade_id,))
+        grade = cursor.fetchone()
     
     if not grade:
         raise HTTPException(status_code=404, detail="Grade not found")
     
-    role_badge = "badge-teacher" if grade['user_role'] == 'teacher' else "badge-student"
+    role_badge = _ROLE_BADGES.get(grade['user_role'], 'badge-student')
     score_pct = int(grade['score'] * 100) if grade['score'] else 0
     
-    # Pretty print XML
-    import xml.dom.minidom
-    try:
-        pretty_xml = xml.dom.minidom.parseString(grade['raw_xml']).toprettyxml(indent="  ")
-    except:
-        pretty_xml = grade['raw_xml']
+    # Formatted when the grade was received; older rows are formatted here
+    formatted_xml = grade['pretty_xml'] or pretty_xml(grade['raw_xml'])
     
     content = f"""
     <div class="flex flex-between mb-2">
@@ -2174,20 +2233,20 @@ async def view_grade(grade_id: int):
     <div class="card">
         <div class="card-title mb-2">Grade Information</div>
         <table>
-            <tr><td class="text-muted">Course</td><td>{grade['course_name']}</td></tr>
-            <tr><td class="text-muted">Tool</td><td>{grade['tool_name']}</td></tr>
+            <tr><td class="text-muted">Course</td><td>{escape(grade['course_name'])}</td></tr>
+            <tr><td class="text-muted">Tool</td><td>{escape(grade['tool_name'])}</td></tr>
             <tr>
                 <td class="text-muted">User</td>
-                <td>{grade['user_name']} <span class="badge {role_badge}">{grade['user_role']}</span></td>
+                <td>{escape(grade['user_name'])} <span class="badge {role_badge}">{escape(grade['user_role'])}</span></td>
             </tr>
             <tr><td class="text-muted">Score</td><td><span class="score text-success">{score_pct}%</span> ({grade['score']})</td></tr>
-            <tr><td class="text-muted">Sourced ID</td><td><code style="word-break: break-all;">{grade['sourced_id']}</code></td></tr>
+            <tr><td class="text-muted">Sourced ID</td><td><code style="word-break: break-all;">{escape(grade['sourced_id'])}</code></td></tr>
         </table>
     </div>
     
     <div class="card">
         <div class="card-title mb-2">Raw XML Payload</div>
-        <div class="code-block"><pre>{pretty_xml}</pre></div>
+        <div class="code-block"><pre>{escape(formatted_xml, quote=False)}</pre></div>
     </div>
     """
     
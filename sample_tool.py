@@ -5,241 +5,178 @@ A simple tool that receives LTI launches and can send grades back.
 Run this on port 8080 to test with the LTI Platform.
 """
 
+import asyncio
 import hashlib
 import hmac
 import base64
-import urllib.parse
-import uuid
+import os
+import secrets
 import time
+from string import Template
+from functools import lru_cache
+from html import escape
+from typing import Optional
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, Form, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 import httpx
 
-app = FastAPI(title="Sample LTI Tool")
+# One client for all grade callbacks, so repeated sends to the same platform
+# reuse pooled keep-alive connections
+http_client: Optional[httpx.AsyncClient] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global http_client
+    http_client = httpx.AsyncClient(
+        timeout=10.0,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+    )
+    yield
+    await http_client.aclose()
+
+
+app = FastAPI(title="Sample LTI Tool", lifespan=lifespan)
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers keep versioned assets (?v=...) for a year."""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if scope.get("query_string"):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+# Only the static/ directory next to this file is served, wherever the
+# tool is started from; its source stays private
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+
+def _asset_version(*names: str) -> str:
+    """Short content hash used to bust the browser cache when an asset changes."""
+    digest = hashlib.sha1()
+    for name in names:
+        with open(os.path.join(STATIC_DIR, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
 
 # Mount static files directory
-app.mount("/static", StaticFiles(directory="."), name="static")
+app.mount("/static", CachedStaticFiles(directory=STATIC_DIR), name="static")
+ASSET_VERSION = _asset_version("tool_launch.css", "tool_grade.css")
 
 # Store launch data temporarily (in production, use a proper database)
+# Launches are kept for LAUNCH_TTL seconds, and at most LAUNCH_STORE_SIZE of
+# them; dicts keep insertion order, so the oldest launch is always first.
+LAUNCH_TTL = 3600
+LAUNCH_STORE_SIZE = 10_000
 launches = {}
 
+
+def store_launch(launch_id: str, params: dict):
+    now = time.time()
+    launches[launch_id] = {'params': params, 'timestamp': now}
+    # Drop expired launches and anything over the size bound, oldest first
+    while launches:
+        oldest_id = next(iter(launches))
+        if len(launches) <= LAUNCH_STORE_SIZE and now - launches[oldest_id]['timestamp'] < LAUNCH_TTL:
+            break
+        del launches[oldest_id]
+
+
+def get_launch(launch_id: str) -> dict:
+    launch_data = launches.get(launch_id)
+    if launch_data is None:
+        raise HTTPException(status_code=404, detail="Launch not found")
+    if time.time() - launch_data['timestamp'] >= LAUNCH_TTL:
+        raise HTTPException(status_code=404, detail="Launch expired")
+    return launch_data
+
 # Expected credentials (should match what you configure in the platform)
 EXPECTED_KEY = "test_key"
 EXPECTED_SECRET = "test_secret"
 
 
+# RFC 3986 unreserved characters; every other byte is percent-encoded.
+_UNRESERVED = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~"
+_QUOTE_TABLE = [bytes([b]) if b in _UNRESERVED else b"%%%02X" % b for b in range(256)]
+
+
+def _quote(data: bytes) -> bytes:
+    """Percent-encode bytes like urllib.parse.quote_from_bytes(data, safe='')."""
+    if not data.translate(None, _UNRESERVED):
+        return data
+    return b"".join([_QUOTE_TABLE[b] for b in data])
+
+
+_QUOTE_TWICE_TABLE = [_quote(_quote(bytes([b]))) for b in range(256)]
+
+
+def _quote_twice(data: bytes) -> bytes:
+    """Equivalent to _quote(_quote(data)), in a single pass."""
+    if not data.translate(None, _UNRESERVED):
+        return data
+    return b"".join([_QUOTE_TWICE_TABLE[b] for b in data])
+
+
+@lru_cache(maxsize=16)
+def _keyed_hmac(consumer_secret: str):
+    """HMAC-SHA1 already keyed with the OAuth signing key; copy it before use."""
+    signing_key = _quote(consumer_secret.encode('utf-8')) + b"&"
+    return hmac.new(signing_key, digestmod=hashlib.sha1)
+
+
+# Launches to one tool all share the "METHOD&quote(url)&" start of the base
+# string; the parameter section after it interleaves keys with per-launch
+# values, so that start is the only part worth hashing once.
+@lru_cache(maxsize=64)
+def _prefixed_hmac(consumer_secret: str, method: str, url: str):
+    """Keyed HMAC that has already consumed the method and URL; copy it before use."""
+    hashed = _keyed_hmac(consumer_secret).copy()
+    hashed.update(method.encode('utf-8') + b"&" + _quote(url.encode('utf-8')) + b"&")
+    return hashed
+
+
 def verify_oauth_signature(method: str, url: str, params: dict, consumer_secret: str, received_signature: str) -> bool:
     """Verify OAuth 1.0a signature."""
-    verify_params = {k: v for k, v in params.items() if k != 'oauth_signature'}
-    sorted_params = sorted(verify_params.items())
-    
-    param_string = "&".join(
-        f"{urllib.parse.quote(str(k), safe='')}"
-        f"={urllib.parse.quote(str(v), safe='')}"
+    sorted_params = tuple(sorted((k, v) for k, v in params.items() if k != 'oauth_signature'))
+    return _verify_sorted(method.upper(), url, sorted_params, consumer_secret, received_signature)
+
+
+# Replayed launches (page reloads, LMS retries) repeat the exact same signed
+# request; the key is the whole signed input, so a hit can only come from an
+# identical request.
+@lru_cache(maxsize=1024)
+def _verify_sorted(method: str, url: str, sorted_params: tuple, consumer_secret: str, received_signature: str) -> bool:
+    # The parameter section is quote(k=v&k=v...); each key and value is
+    # double-encoded directly rather than re-encoding the joined string
+    param_section = b"%26".join([
+        _quote_twice(str(k).encode('utf-8')) + b"%3D" + _quote_twice(str(v).encode('utf-8'))
         for k, v in sorted_params
-    )
-    
-    signature_base = "&".join([
-        method.upper(),
-        urllib.parse.quote(url, safe=''),
-        urllib.parse.quote(param_string, safe='')
     ])
     
-    signing_key = f"{urllib.parse.quote(consumer_secret, safe='')}&"
-    
-    hashed = hmac.new(
-        signing_key.encode('utf-8'),
-        signature_base.encode('utf-8'),
-        hashlib.sha1
-    )
-    expected_signature = base64.b64encode(hashed.digest()).decode('utf-8')
+    hashed = _prefixed_hmac(consumer_secret, method, url).copy()
+    hashed.update(param_section)
+    expected_signature = base64.b64encode(hashed.digest())
     
-    return hmac.compare_digest(expected_signature, received_signature)
+    return hmac.compare_digest(expected_signature, received_signature.encode('utf-8'))
 
 
-@app.post("/lti/launch", response_class=HTMLResponse)
-async def lti_launch(request: Request):
-    """Handle LTI launch requests."""
-    form_data = await request.form()
-    params = dict(form_data)
-    
-    # Validate required LTI parameters
-    if params.get('lti_message_type') != 'basic-lti-launch-request':
-        raise HTTPException(status_code=400, detail="Invalid LTI message type")
-    
-    if params.get('lti_version') != 'LTI-1p0':
-        raise HTTPException(status_code=400, detail="Invalid LTI version")
-    
-    # Verify OAuth
-    consumer_key = params.get('oauth_consumer_key')
-    if consumer_key != EXPECTED_KEY:
-        raise HTTPException(status_code=401, detail="Invalid consumer key")
-    
-    url = str(request.url).split('?')[0]
-    received_signature = params.get('oauth_signature', '')
-    
-    if not verify_oauth_signature('POST', url, params, EXPECTED_SECRET, received_signature):
-        print(f"WARNING: OAuth signature mismatch. URL: {url}")
-    
-    # Store launch data
-    launch_id = str(uuid.uuid4())
-    launches[launch_id] = {'params': params, 'timestamp': time.time()}
-    
-    # Extract user info
-    user_name = params.get('lis_person_name_full', 'Unknown User')
-    user_role = params.get('roles', 'Unknown')
-    course_name = params.get('context_title', 'Unknown Course')
-    resource_title = params.get('resource_link_title', 'Activity')
-    
-    # Check if we can send grades
-    outcomes_url = params.get('lis_outcome_service_url')
-    sourced_id = params.get('lis_result_sourcedid')
-    can_send_grade = bool(outcomes_url and sourced_id)
-    
-    grade_form = ""
-    if can_send_grade:
-        grade_form = f'''
-        <div class="grade-section">
-            <h3>📊 Send Grade</h3>
-            <form action="/send-grade" method="post">
-                <input type="hidden" name="launch_id" value="{launch_id}">
-                <div class="form-group">
-                    <label>Score (0.0 - 1.0):</label>
-                    <input type="number" name="score" min="0" max="1" step="0.01" value="0.85" required>
-                </div>
-                <button type="submit" class="btn btn-success">Send Grade to Platform</button>
-            </form>
-        </div>
-        '''
-    
-    params_display = "\n".join(f"<tr><td>{k}</td><td>{v}</td></tr>" for k, v in sorted(params.items()))
-    
-    html = f'''
+# The launch page is built once and only the launch's own values are
+# substituted per request. The parameter table is fetched from
+# /lti/launch/{launch_id}/params the first time it is expanded.
+_LAUNCH_PAGE_HEAD = Template('''
     <!DOCTYPE html>
     <html>
     <head>
-        <title>LTI Tool - {resource_title}</title>
-        <style>
-            * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-            body {{
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                padding: 2rem;
-            }}
-            .container {{
-                max-width: 900px;
-                margin: 0 auto;
-                background: white;
-                border-radius: 16px;
-                box-shadow: 0 25px 50px -12px rgba(0,0,0,0.25);
-                overflow: hidden;
-            }}
-            .header {{
-                background: linear-gradient(135deg, #1e3a5f 0%, #2d5a87 100%);
-                color: white;
-                padding: 2rem;
-            }}
-            .header h1 {{ font-size: 1.5rem; margin-bottom: 0.5rem; }}
-            .header p {{ opacity: 0.8; }}
-            .content {{ padding: 2rem; }}
-            .info-card {{
-                background: #f8fafc;
-                border-radius: 8px;
-                padding: 1.5rem;
-                margin-bottom: 1.5rem;
-            }}
-            .info-card h3 {{ color: #1e3a5f; margin-bottom: 1rem; }}
-            .info-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                gap: 1rem;
-            }}
-            .info-item {{
-                padding: 0.75rem;
-                background: white;
-                border-radius: 6px;
-                border: 1px solid #e2e8f0;
-            }}
-            .info-item label {{
-                font-size: 0.75rem;
-                color: #64748b;
-                text-transform: uppercase;
-                letter-spacing: 0.05em;
-            }}
-            .info-item p {{
-                font-weight: 600;
-                color: #1e293b;
-                margin-top: 0.25rem;
-            }}
-            .grade-section {{
-                background: #ecfdf5;
-                border: 1px solid #a7f3d0;
-                border-radius: 8px;
-                padding: 1.5rem;
-                margin-bottom: 1.5rem;
-            }}
-            .grade-section h3 {{ color: #065f46; margin-bottom: 1rem; }}
-            .form-group {{ margin-bottom: 1rem; }}
-            .form-group label {{ display: block; margin-bottom: 0.5rem; font-weight: 500; }}
-            .form-group input {{
-                padding: 0.75rem;
-                border: 1px solid #d1d5db;
-                border-radius: 6px;
-                font-size: 1rem;
-                width: 150px;
-            }}
-            .btn {{
-                padding: 0.75rem 1.5rem;
-                border: none;
-                border-radius: 6px;
-                font-weight: 600;
-                cursor: pointer;
-                font-size: 0.9rem;
-            }}
-            .btn-success {{ background: #10b981; color: white; }}
-            .btn-success:hover {{ background: #059669; }}
-            .params-table {{
-                width: 100%;
-                border-collapse: collapse;
-                font-size: 0.85rem;
-            }}
-            .params-table td {{
-                padding: 0.5rem;
-                border-bottom: 1px solid #e2e8f0;
-                vertical-align: top;
-            }}
-            .params-table td:first-child {{
-                font-weight: 500;
-                color: #64748b;
-                width: 250px;
-            }}
-            .params-table td:last-child {{
-                word-break: break-all;
-                font-family: monospace;
-                font-size: 0.8rem;
-            }}
-            details {{ margin-top: 1rem; }}
-            summary {{
-                cursor: pointer;
-                font-weight: 600;
-                color: #1e3a5f;
-                padding: 0.5rem;
-                background: #f1f5f9;
-                border-radius: 6px;
-            }}
-            .activity-content {{
-                background: #fef3c7;
-                border: 1px solid #fcd34d;
-                border-radius: 8px;
-                padding: 1.5rem;
-                margin-bottom: 1.5rem;
-            }}
-            .activity-content h3 {{ color: #92400e; margin-bottom: 1rem; }}
-        </style>
+        <title>LTI Tool - ${resource_title}</title>
+        <link rel="stylesheet" href="/static/tool_launch.css?v=''' + ASSET_VERSION + '''">
     </head>
     <body>
         <div class="container">
@@ -260,19 +197,19 @@ async def lti_launch(request: Request):
                     <div class="info-grid">
                         <div class="info-item">
                             <label>User</label>
-                            <p>{user_name}</p>
+                            <p>${user_name}</p>
                         </div>
                         <div class="info-item">
                             <label>Role</label>
-                            <p>{user_role}</p>
+                            <p>${user_role}</p>
                         </div>
                         <div class="info-item">
                             <label>Course</label>
-                            <p>{course_name}</p>
+                            <p>${course_name}</p>
                         </div>
                         <div class="info-item">
                             <label>Activity</label>
-                            <p>{resource_title}</p>
+                            <p>${resource_title}</p>
                         </div>
                     </div>
                 </div>
@@ -288,117 +225,194 @@ async def lti_launch(request: Request):
                     </ul>
                 </div>
                 
-                {grade_form}
+                ${grade_form}
                 
-                <details>
+                <details ontoggle="loadParams(this)" data-launch-id="${launch_id}">
                     <summary>📋 View All Launch Parameters</summary>
                     <div style="margin-top: 1rem; max-height: 400px; overflow-y: auto;">
-                        <table class="params-table">
-                            {params_display}
+                        <table class="params-table" id="params-table">
+                            ''')
+
+_LAUNCH_PAGE_TAIL = '''
                         </table>
                     </div>
                 </details>
             </div>
         </div>
+        <script>
+            function loadParams(details) {
+                if (!details.open || details.dataset.loaded) return;
+                details.dataset.loaded = "1";
+                fetch("/lti/launch/" + details.dataset.launchId + "/params")
+                    .then(response => response.text())
+                    .then(rows => { document.getElementById("params-table").innerHTML = rows; });
+            }
+        </script>
     </body>
     </html>
-    '''
-    
-    return HTMLResponse(html)
+    '''.encode()
+
+_GRADE_FORM = Template('''
+        <div class="grade-section">
+            <h3>📊 Send Grade</h3>
+            <form action="/send-grade" method="post">
+                <input type="hidden" name="launch_id" value="${launch_id}">
+                <div class="form-group">
+                    <label>Score (0.0 - 1.0):</label>
+                    <input type="number" name="score" min="0" max="1" step="0.01" value="0.85" required>
+                </div>
+                <button type="submit" class="btn btn-success">Send Grade to Platform</button>
+            </form>
+        </div>
+        ''')
 
 
-@app.post("/send-grade", response_class=HTMLResponse)
-async def send_grade(launch_id: str = Form(...), score: float = Form(...)):
-    """Send a grade back to the LTI platform."""
+@app.post("/lti/launch", response_class=HTMLResponse)
+async def lti_launch(request: Request):
+    """Handle LTI launch requests."""
+    form_data = await request.form()
+    params = dict(form_data.multi_items())
     
-    if launch_id not in launches:
-        raise HTTPException(status_code=404, detail="Launch not found")
+    # Validate required LTI parameters
+    if params.get('lti_message_type') != 'basic-lti-launch-request':
+        raise HTTPException(status_code=400, detail="Invalid LTI message type")
+    
+    if params.get('lti_version') != 'LTI-1p0':
+        raise HTTPException(status_code=400, detail="Invalid LTI version")
     
-    launch_data = launches[launch_id]
-    params = launch_data['params']
+    # Verify OAuth
+    consumer_key = params.get('oauth_consumer_key')
+    # Constant-time, like the signature check
+    if not hmac.compare_digest((consumer_key or "").encode('utf-8'), EXPECTED_KEY.encode('utf-8')):
+        raise HTTPException(status_code=401, detail="Invalid consumer key")
     
+    url = str(request.url).split('?')[0]
+    received_signature = params.get('oauth_signature', '')
+    
+    # Signing large launches is CPU work; keep it off the event loop
+    verified = await run_in_threadpool(
+        verify_oauth_signature, 'POST', url, params, EXPECTED_SECRET, received_signature
+    )
+    if not verified:
+        print(f"WARNING: OAuth signature mismatch. URL: {url}")
+    
+    # Store launch data
+    launch_id = secrets.token_hex(16)
+    store_launch(launch_id, params)
+    
+    # Extract user info
+    user_name = params.get('lis_person_name_full', 'Unknown User')
+    user_role = params.get('roles', 'Unknown')
+    course_name = params.get('context_title', 'Unknown Course')
+    resource_title = params.get('resource_link_title', 'Activity')
+    
+    # Check if we can send grades
     outcomes_url = params.get('lis_outcome_service_url')
     sourced_id = params.get('lis_result_sourcedid')
+    can_send_grade = bool(outcomes_url and sourced_id)
     
-    if not outcomes_url or not sourced_id:
-        raise HTTPException(status_code=400, detail="Outcomes not supported")
+    grade_form = ""
+    if can_send_grade:
+        grade_form = _GRADE_FORM.substitute(launch_id=launch_id)
+    
+    head = _LAUNCH_PAGE_HEAD.substitute(
+        resource_title=escape(resource_title),
+        user_name=escape(user_name),
+        user_role=escape(user_role),
+        course_name=escape(course_name),
+        grade_form=grade_form,
+        launch_id=launch_id,
+    )
     
-    message_id = str(uuid.uuid4())
-    xml_payload = f'''<?xml version="1.0" encoding="UTF-8"?>
+    return HTMLResponse(head.encode('utf-8') + _LAUNCH_PAGE_TAIL)
+
+
+@app.get("/lti/launch/{launch_id}/params", response_class=HTMLResponse)
+async def launch_params(launch_id: str):
+    """Rows of the launch page's parameter table, rendered on first request."""
+    launch_data = get_launch(launch_id)
+    if 'rows' not in launch_data:
+        launch_data['rows'] = "".join([
+            f"<tr><td>{escape(k)}</td><td>{escape(v)}</td></tr>\n"
+            for k, v in sorted(launch_data['params'].items())
+        ])
+    return HTMLResponse(launch_data['rows'])
+
+
+# replaceResult request sent to the platform's outcomes service; the values
+# are filled in with bytes %-formatting
+_REPLACE_RESULT_REQUEST = b'''<?xml version="1.0" encoding="UTF-8"?>
 <imsx_POXEnvelopeRequest xmlns="http://www.imsglobal.org/services/ltiv1p1/xsd/imsoms_v1p0">
   <imsx_POXHeader>
     <imsx_POXRequestHeaderInfo>
       <imsx_version>V1.0</imsx_version>
-      <imsx_messageIdentifier>{message_id}</imsx_messageIdentifier>
+      <imsx_messageIdentifier>%(message_id)s</imsx_messageIdentifier>
     </imsx_POXRequestHeaderInfo>
   </imsx_POXHeader>
   <imsx_POXBody>
     <replaceResultRequest>
       <resultRecord>
         <sourcedGUID>
-          <sourcedId>{sourced_id}</sourcedId>
+          <sourcedId>%(sourced_id)s</sourcedId>
         </sourcedGUID>
         <result>
           <resultScore>
             <language>en</language>
-            <textString>{score}</textString>
+            <textString>%(score)s</textString>
           </resultScore>
         </result>
       </resultRecord>
     </replaceResultRequest>
   </imsx_POXBody>
 </imsx_POXEnvelopeRequest>'''
+
+
+def _grade_target(launch_id: str) -> tuple:
+    """The (outcomes_url, sourced_id) a launch's grades are sent to."""
+    params = get_launch(launch_id)['params']
+    
+    outcomes_url = params.get('lis_outcome_service_url')
+    sourced_id = params.get('lis_result_sourcedid')
+    
+    if not outcomes_url or not sourced_id:
+        raise HTTPException(status_code=400, detail="Outcomes not supported")
+    return outcomes_url, sourced_id
+
+
+async def _post_grade(outcomes_url: str, sourced_id: str, score: float) -> httpx.Response:
+    xml_payload = _REPLACE_RESULT_REQUEST % {
+        b'message_id': secrets.token_hex(16).encode(),
+        b'sourced_id': escape(sourced_id, quote=False).encode(),
+        b'score': str(score).encode(),
+    }
+    return await http_client.post(
+        outcomes_url,
+        content=xml_payload,
+        headers={'Content-Type': 'application/xml'}
+    )
+
+
+def _grade_accepted(response: httpx.Response) -> bool:
+    return response.status_code == 200 and 'success' in response.text.lower()
+
+
+@app.post("/send-grade", response_class=HTMLResponse)
+async def send_grade(launch_id: str = Form(...), score: float = Form(...)):
+    """Send a grade back to the LTI platform."""
+    
+    outcomes_url, sourced_id = _grade_target(launch_id)
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                outcomes_url,
-                content=xml_payload,
-                headers={'Content-Type': 'application/xml'}
-            )
+        response = await _post_grade(outcomes_url, sourced_id, score)
         
-        success = response.status_code == 200 and 'success' in response.text.lower()
+        success = _grade_accepted(response)
         
         return HTMLResponse(f'''
         <!DOCTYPE html>
         <html>
         <head>
             <title>Grade Sent</title>
-            <style>
-                body {{
-                    font-family: -apple-system, sans-serif;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    min-height: 100vh;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                    padding: 2rem;
-                }}
-                .card {{
-                    background: white;
-                    border-radius: 16px;
-                    padding: 2rem;
-                    max-width: 600px;
-                    box-shadow: 0 25px 50px -12px rgba(0,0,0,0.25);
-                }}
-                .success {{ color: #10b981; }}
-                .error {{ color: #ef4444; }}
-                h1 {{ margin-bottom: 1rem; }}
-                pre {{
-                    background: #f1f5f9;
-                    padding: 1rem;
-                    border-radius: 8px;
-                    overflow-x: auto;
-                    font-size: 0.8rem;
-                    max-height: 300px;
-                    overflow-y: auto;
-                }}
-                .back-link {{
-                    display: inline-block;
-                    margin-top: 1rem;
-                    color: #6366f1;
-                }}
-            </style>
+            <link rel="stylesheet" href="/static/tool_grade.css?v={ASSET_VERSION}">
         </head>
         <body>
             <div class="card">
@@ -406,9 +420,9 @@ async def send_grade(launch_id: str = Form(...), score: float = Form(...)):
                     {'✅ Grade Sent Successfully!' if success else '❌ Failed to Send Grade'}
                 </h1>
                 <p><strong>Score:</strong> {score} ({int(score * 100)}%)</p>
-                <p><strong>Outcomes URL:</strong> {outcomes_url}</p>
+                <p><strong>Outcomes URL:</strong> {escape(outcomes_url)}</p>
                 <h3 style="margin-top: 1rem;">Response:</h3>
-                <pre>{response.text}</pre>
+                <pre>{escape(response.text)}</pre>
                 <a href="javascript:history.back()" class="back-link">← Back to Activity</a>
             </div>
         </body>
@@ -419,9 +433,39 @@ async def send_grade(launch_id: str = Form(...), score: float = Form(...)):
         raise HTTPException(status_code=500, detail=f"Failed to send grade: {str(e)}")
 
 
-@app.get("/", response_class=HTMLResponse)
-async def index():
-    return HTMLResponse('''
+# Bulk sends share the pooled client; this caps how many hit the platform at once
+BULK_GRADE_CONCURRENCY = 20
+
+
+@app.post("/send-grades-bulk")
+async def send_grades_bulk(request: Request):
+    """Send several grades concurrently; the body is [{"launch_id": ..., "score": ...}, ...]."""
+    try:
+        grades = [(str(grade['launch_id']), float(grade['score'])) for grade in await request.json()]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Expected a list of {launch_id, score} objects")
+    
+    semaphore = asyncio.Semaphore(BULK_GRADE_CONCURRENCY)
+    
+    async def send_one(launch_id: str, score: float) -> dict:
+        async with semaphore:
+            try:
+                outcomes_url, sourced_id = _grade_target(launch_id)
+                response = await _post_grade(outcomes_url, sourced_id, score)
+            except HTTPException as e:
+                return {'launch_id': launch_id, 'success': False, 'error': e.detail}
+            except Exception as e:
+                # Anything else (transport errors, but also a malformed outcomes
+                # URL) fails this entry only, not the rest of the batch
+                return {'launch_id': launch_id, 'success': False, 'error': str(e)}
+        return {'launch_id': launch_id, 'success': _grade_accepted(response)}
+    
+    results = await asyncio.gather(*[send_one(launch_id, score) for launch_id, score in grades])
+    return {'results': results}
+
+
+# The index page never changes, so it is encoded once
+_INDEX_PAGE = '''
     <!DOCTYPE html>
     <html>
     <head>
@@ -469,7 +513,12 @@ async def index():
         </div>
     </body>
     </html>
-    ''')
+    '''.encode()
+
+
+@app.get("/", response_class=HTMLResponse)
+async def index():
+    return HTMLResponse(_INDEX_PAGE)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,26 @@
+function showTab(tabId) {
+    document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
+    document.querySelectorAll('.tab-content').forEach(c => c.classList.remove('active'));
+    document.querySelector(`[data-tab="${tabId}"]`).classList.add('active');
+    document.getElementById(tabId).classList.add('active');
+}
+
+function selectUser(userId, element) {
+    document.querySelectorAll('.user-card').forEach(c => c.classList.remove('selected'));
+    element.classList.add('selected');
+    document.getElementById('selected_user_id').value = userId;
+}
+
+function openModal(modalId) {
+    document.getElementById(modalId).classList.add('active');
+}
+
+function closeModal(modalId) {
+    document.getElementById(modalId).classList.remove('active');
+}
+
+function confirmDelete(url, name) {
+    if (confirm(`Are you sure you want to delete "${name}"?`)) {
+        window.location.href = url;
+    }
+}